@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 import datetime as dt
 from dateutil import parser
-from a002_processor import run_feed_processor, clean_timestamp, get_most_recent_time
+from a002_processor import run_feed_processor, get_most_recent_time
+from a02_utils import normalize_feed_times
+from a09_measurement_store import load_measurement_store, default_sheet as default_sheet_name
 from a003_models import run_a_model_detection
 
 
@@ -38,15 +40,14 @@ if small_feed_file and big_feed_file and measurement_file:
 
     small_df.columns = small_df.columns.str.strip().str.lower()
     big_df.columns = big_df.columns.str.strip().str.lower()
-    small_df["time"] = small_df["time"].apply(clean_timestamp)
-    big_df["time"] = big_df["time"].apply(clean_timestamp)
+    normalize_feed_times(small_df)
+    normalize_feed_times(big_df)
 
-    xls = pd.ExcelFile(measurement_file)
-    available_sheets = xls.sheet_names
-    default_sheet = "2a" if "2a" in available_sheets else available_sheets[0]
+    measurement_store = load_measurement_store(measurement_file)
+    available_sheets = measurement_store["sheet_names"]
+    default_sheet = default_sheet_name(measurement_store)
     sheet_choice = st.selectbox("Select measurement tab", available_sheets, index=available_sheets.index(default_sheet))
-    measurements = pd.read_excel(measurement_file, sheet_name=sheet_choice)
-    measurements.columns = measurements.columns.str.strip().str.lower()
+    measurements = measurement_store["sheets"][sheet_choice]
 
     # Determine report time if not chosen manually
     if report_mode == "Most Current":
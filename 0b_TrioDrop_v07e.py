@@ -3,6 +3,7 @@ import pandas as pd
 import datetime as dt
 from dateutil import parser
 from collections import defaultdict
+from a15_sequences import maximal_sequences
 
 # 🌐 Config
 st.set_page_config(layout="wide")
@@ -165,11 +166,8 @@ def find_flexible_descents(df_subset):
             seen.add(abs_m)
             last_abs = abs_m
 
-    filtered = []
     all_signatures = [tuple(seq["M #"].tolist()) for seq in raw_sequences]
-    for i, sig in enumerate(all_signatures):
-        longer = any(set(sig).issubset(set(other)) and len(sig) < len(other) for j, other in enumerate(all_signatures) if i != j)
-        if not longer: filtered.append(raw_sequences[i])
+    filtered = [raw_sequences[i] for i in maximal_sequences(all_signatures)]
     return filtered
 
 def classify_A_model(row_0, prior_rows):
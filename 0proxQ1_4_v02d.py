@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+from a14_schemas import PROX_TRAVELER_SCHEMA, read_with_schema
 from itertools import combinations
 from collections import defaultdict
 
@@ -11,17 +12,8 @@ uploaded_file = st.file_uploader("Upload your CSV file", type=["csv"])
 if not uploaded_file:
     st.stop()
 
-df = pd.read_csv(uploaded_file)
-
-# --- Data Preprocessing ---
-for col in ['Arrival', 'Departure']:
-    if col in df.columns:
-        df[col] = pd.to_datetime(df[col], errors='coerce')
-
-df['M Name'] = pd.to_numeric(df['M Name'], errors='coerce')
-df['Output'] = pd.to_numeric(df['Output'], errors='coerce')
-df['Origin'] = pd.to_numeric(df['Origin'], errors='coerce')
-df['Day'] = df['Day'].astype(str)
+# --- Typed parse: Arrival/Departure datetimes, numeric M Name/Output/Origin, text Day ---
+df = read_with_schema(uploaded_file, PROX_TRAVELER_SCHEMA)
 
 initial_len = len(df)
 df = df.dropna(subset=['Arrival', 'Output'])
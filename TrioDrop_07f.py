@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import datetime as dt
 from dateutil import parser
+from a02_utils import find_changed_rows, normalize_feed_times
+from a06_feed_cache import load_feed
+from a09_measurement_store import load_measurement_store, default_sheet as default_sheet_name
 
 # 🔧 Utilities
 def clean_timestamp(ts):
@@ -63,7 +66,7 @@ def get_input_value(df, report_time):
 
 def process_feed(df, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value):
     df.columns = df.columns.str.strip().str.lower()
-    df["time"] = df["time"].apply(clean_timestamp)
+    normalize_feed_times(df)
     df = df.iloc[::-1]
     origins = extract_origins(df.columns)
     new_data_rows = []
@@ -124,31 +127,27 @@ def process_feed(df, feed_type, report_time, scope_type, scope_value, start_hour
                 })
             continue
 
-        for i in range(len(relevant_rows) - 1):
+        for i in find_changed_rows(relevant_rows[cols].to_numpy()):
             current = relevant_rows.iloc[i]
-            above = relevant_rows.iloc[i + 1]
-            changed = any(current[col] != above[col] for col in cols)
-
-            if changed:
-                arrival_time = current["time"]
-                H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
-                for _, row in measurements.iterrows():
-                    output = calculate_pivot(H, L, C, row["m value"])
-                    day = get_day_index(arrival_time, report_time, start_hour)
-                    new_data_rows.append({
-                        "Feed": feed_type,
-                        "Arrival": arrival_time,
-                        "Origin": origin,
-                        "M Name": row["m name"],
-                        "M #": row["m #"],
-                        "R #": row["r #"],
-                        "Tag": row["tag"],
-                        "Family": row["family"],
-                        "Input": input_value,
-                        "Output": output,
-                        "Diff": output - input_value,
-                        "Day": day
-                    })
+            arrival_time = current["time"]
+            H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
+            for _, row in measurements.iterrows():
+                output = calculate_pivot(H, L, C, row["m value"])
+                day = get_day_index(arrival_time, report_time, start_hour)
+                new_data_rows.append({
+                    "Feed": feed_type,
+                    "Arrival": arrival_time,
+                    "Origin": origin,
+                    "M Name": row["m name"],
+                    "M #": row["m #"],
+                    "R #": row["r #"],
+                    "Tag": row["tag"],
+                    "Family": row["family"],
+                    "Input": input_value,
+                    "Output": output,
+                    "Diff": output - input_value,
+                    "Day": day
+                })
 
     return new_data_rows
 
@@ -180,20 +179,15 @@ scope_value = st.number_input(f"Enter number of {scope_type.lower()}", min_value
 if small_feed_file and big_feed_file and measurement_file:
     try:
         # Read and clean feeds
-        small_df = pd.read_csv(small_feed_file)
-        big_df = pd.read_csv(big_feed_file)
-        small_df.columns = small_df.columns.str.strip().str.lower()
-        big_df.columns = big_df.columns.str.strip().str.lower()
-        small_df["time"] = small_df["time"].apply(clean_timestamp)
-        big_df["time"] = big_df["time"].apply(clean_timestamp)
+        small_df = load_feed(small_feed_file)
+        big_df = load_feed(big_feed_file)
 
         # Load measurements
-        xls = pd.ExcelFile(measurement_file)
-        available_sheets = xls.sheet_names
-        default_sheet = "2a" if "2a" in available_sheets else available_sheets[0]
+        measurement_store = load_measurement_store(measurement_file)
+        available_sheets = measurement_store["sheet_names"]
+        default_sheet = default_sheet_name(measurement_store)
         sheet_choice = st.selectbox("Select measurement tab", available_sheets, index=available_sheets.index(default_sheet))
-        measurements = pd.read_excel(measurement_file, sheet_name=sheet_choice)
-        measurements.columns = measurements.columns.str.strip().str.lower()
+        measurements = measurement_store["sheets"][sheet_choice]
 
         # Auto-set report time if needed
         if report_mode == "Most Current":
@@ -1,6 +1,7 @@
 import pandas as pd
 import datetime as dt
 from dateutil import parser
+from a02_utils import find_changed_rows, normalize_feed_times
 
 # 🔬 Feed parsing, merging, and traveler report generation 
 
@@ -72,7 +73,7 @@ def run_feed_processor(small_df, big_df, measurements, report_time, scope_type,
 
     def process_feed(df, feed_type):
         df.columns = df.columns.str.strip().str.lower()
-        df["time"] = df["time"].apply(clean_timestamp)
+        normalize_feed_times(df)
         df = df.iloc[::-1]
         origins = extract_origins(df.columns)
 
@@ -136,13 +137,8 @@ def run_feed_processor(small_df, big_df, measurements, report_time, scope_type,
                     })
                 continue
 
-            for i in range(len(relevant_rows) - 1):
+            for i in find_changed_rows(relevant_rows[cols].to_numpy()):
                 current = relevant_rows.iloc[i]
-                above = relevant_rows.iloc[i + 1]
-                changed = any(current[col] != above[col] for col in cols)
-                if not changed:
-                    continue
-
                 arrival_time = current["time"]
                 H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
                 for _, row in measurements.iterrows():
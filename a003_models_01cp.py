@@ -1,6 +1,11 @@
-import streamlit as st
+try:
+    import streamlit as st
+except ImportError:  # headless use (a10_cli.py) only needs the detectors
+    st = None
 import pandas as pd
 from collections import defaultdict
+from a15_sequences import maximal_sequences, iter_output_groups, make_record, sequence_rows
+from a16_origin_classes import EPIC_ORIGINS, ANCHOR_ORIGINS
 
 # -----------------------
 # Helper functions
@@ -12,8 +17,7 @@ def sequence_signature(seq):
     return tuple(seq["M #"].tolist())
 
 def classify_A_model(row_0, prior_rows):
-    epic = {"trinidad", "tobago", "wasp-12b", "macedonia"}
-    anchor = {"spain", "saturn", "jupiter", "kepler-62", "kepler-44"}
+    epic, anchor = EPIC_ORIGINS, ANCHOR_ORIGINS
     t0 = row_0["Arrival"]
     o0 = row_0["Origin"].lower()
     time = "open" if t0.hour == 18 and t0.minute == 0 else \
@@ -54,13 +58,8 @@ def find_flexible_descents(rows):
             seen.add(abs_m)
             last_abs = abs_m
     # Remove embedded shorter sequences
-    filtered = []
     all_signatures = [tuple(seq["M #"].tolist()) for seq in raw_sequences]
-    for i, sig in enumerate(all_signatures):
-        longer = any(set(sig).issubset(set(other)) and len(sig) < len(other) 
-                     for j, other in enumerate(all_signatures) if i != j)
-        if not longer:
-            filtered.append(raw_sequences[i])
+    filtered = [raw_sequences[i] for i in maximal_sequences(all_signatures)]
     return filtered
 
 def find_pairs(rows, seen_signatures):
@@ -83,8 +82,7 @@ def detect_A_models(df):
     model_outputs = defaultdict(list)
     all_signatures = set()
 
-    for output in df["Output"].unique():
-        subset = df[df["Output"] == output].sort_values("Arrival").reset_index(drop=True)
+    for output, subset, positions in iter_output_groups(df):
         full_matches = find_flexible_descents(subset)
 
         for seq in full_matches:
@@ -98,13 +96,7 @@ def detect_A_models(df):
             last = seq.iloc[-1]
             model, label = classify_A_model(last, prior)
             if model:
-                model_outputs[model].append({
-                    "label": label,
-                    "output": output,
-                    "timestamp": last["Arrival"],
-                    "sequence": seq,
-                    "feeds": seq["Feed"].nunique()
-                })
+                model_outputs[model].append(make_record(model, label, output, seq, positions))
 
         # Now find 2-member pairs not already used
         pairs = find_pairs(subset, all_signatures)
@@ -118,17 +110,11 @@ def detect_A_models(df):
             model, label = classify_A_model(last, prior)
             if model:
                 pr_model = model + "pr"
-                model_outputs[pr_model].append({
-                    "label": f"Pair to {label}",
-                    "output": output,
-                    "timestamp": last["Arrival"],
-                    "sequence": seq,
-                    "feeds": seq["Feed"].nunique()
-                })
+                model_outputs[pr_model].append(make_record(pr_model, f"Pair to {label}", output, seq, positions))
 
     return model_outputs, report_time
 
-def show_a_model_results(model_outputs, report_time):
+def show_a_model_results(model_outputs, report_time, df):
     base_labels = {
         "A01": "Open Epic 0", "A02": "Open Anchor 0", "A03": "Open non-Anchor 0",
         "A04": "Early non-Anchor 0", "A05": "Late Anchor 0", "A06": "Late non-Anchor 0",
@@ -144,9 +130,10 @@ def show_a_model_results(model_outputs, report_time):
             header = f"{key}. {title} – {output_count} output{'s' if output_count != 1 else ''}"
 
             with st.expander(header):
-                today = [r for r in results if "[0]" in str(r["sequence"].iloc[-1]["Day"])]
-                other = [r for r in results if "[0]" not in str(r["sequence"].iloc[-1]["Day"])]
-                
+                last_days = df["Day"].to_numpy()[[r["rows"][-1] for r in results]]
+                today_results = [r for r, day in zip(results, last_days) if "[0]" in str(day)]
+                other_results = [r for r, day in zip(results, last_days) if "[0]" not in str(day)]
+
                 def render_group(name, group):
                     st.markdown(f"#### {name}")
                     output_groups = defaultdict(list)
@@ -161,9 +148,9 @@ def show_a_model_results(model_outputs, report_time):
 
                         with st.expander(subhead):
                             for res in items:
-                                seq = res["sequence"]
-                                m_path = " → ".join([f"|{row['M #']}|" for _, row in seq.iterrows()])
-                                icons = "".join([feed_icon(row["Feed"]) for _, row in seq.iterrows()])
+                                seq = sequence_rows(df, res)
+                                m_path = " → ".join(f"|{m}|" for m in seq["M #"].tolist())
+                                icons = "".join(feed_icon(str(feed)) for feed in seq["Feed"].tolist())
                                 st.markdown(f"{m_path} Cross [{icons}]")
                                 st.table(seq.reset_index(drop=True))
 
@@ -177,7 +164,7 @@ def show_a_model_results(model_outputs, report_time):
 # Optional top-level run method
 def run_a_model_detection(df):
     model_outputs, report_time = detect_A_models(df)
-    show_a_model_results(model_outputs, report_time)
+    show_a_model_results(model_outputs, report_time, df)
     return model_outputs
 
 # -----------------------
@@ -188,12 +175,9 @@ def detect_B_models(df):
     report_time = df["Arrival"].max()
     b_outputs = defaultdict(list)
 
-    anchor = {"spain", "saturn", "jupiter", "kepler-62", "kepler-44"}
-    epic = {"trinidad", "tobago", "wasp-12b", "macedonia"}
-
-    for output in df["Output"].unique():
-        subset = df[df["Output"] == output].sort_values("Arrival").reset_index(drop=True)
+    anchor, epic = ANCHOR_ORIGINS, EPIC_ORIGINS
 
+    for output, subset, positions in iter_output_groups(df):
         for i in range(len(subset) - 2):
             group = subset.iloc[i:i+3]
 
@@ -224,17 +208,11 @@ def detect_B_models(df):
             else:
                 continue
 
-            b_outputs[code].append({
-                "label": label,
-                "output": output,
-                "timestamp": group.iloc[-1]["Arrival"],
-                "sequence": group,
-                "feeds": len(feeds)
-            })
+            b_outputs[code].append(make_record(code, label, output, group, positions))
 
     return b_outputs, report_time
 
-def show_b_model_results(b_outputs, report_time):
+def show_b_model_results(b_outputs, report_time, df):
     label_map = {
         "B01": "Same Polarity Descenders",
         "B02": "Mixed Polarity Descenders"
@@ -251,9 +229,10 @@ def show_b_model_results(b_outputs, report_time):
         header = f"{code}. {label} – {output_count} output{'s' if output_count != 1 else ''}"
 
         with st.expander(header):
-            today = [r for r in results if "[0]" in str(r["sequence"].iloc[-1]["Day"])]
-            other = [r for r in results if "[0]" not in str(r["sequence"].iloc[-1]["Day"])]
-            
+            last_days = df["Day"].to_numpy()[[r["rows"][-1] for r in results]]
+            today = [r for r, day in zip(results, last_days) if "[0]" in str(day)]
+            other = [r for r, day in zip(results, last_days) if "[0]" not in str(day)]
+
             def render_group(title, group):
                 st.markdown(f"#### {title}")
                 outputs = defaultdict(list)
@@ -268,9 +247,9 @@ def show_b_model_results(b_outputs, report_time):
 
                     with st.expander(subhead):
                         for res in items:
-                            seq = res["sequence"]
-                            m_path = " → ".join([f"|{row['M #']}|" for _, row in seq.iterrows()])
-                            icons = "".join([feed_icon(row["Feed"]) for _, row in seq.iterrows()])
+                            seq = sequence_rows(df, res)
+                            m_path = " → ".join(f"|{m}|" for m in seq["M #"].tolist())
+                            icons = "".join(feed_icon(str(feed)) for feed in seq["Feed"].tolist())
                             st.markdown(f"{m_path} Cross [{icons}]")
                             st.table(seq.reset_index(drop=True))
 
@@ -284,5 +263,5 @@ def show_b_model_results(b_outputs, report_time):
 # Optional top-level run method
 def run_b_model_detection(df):
     b_outputs, report_time = detect_B_models(df)
-    show_b_model_results(b_outputs, report_time)
+    show_b_model_results(b_outputs, report_time, df)
     return b_outputs
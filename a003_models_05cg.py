@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from collections import defaultdict
+from a15_sequences import maximal_sequences
 
 # Project file 3; Models, v6, A, B & C models ***
 # -----------------------
@@ -109,13 +110,8 @@ def find_flexible_descents(rows):
             path.append(j)
             seen.add(abs_m)
             last_abs = abs_m
-    filtered = []
     all_signatures = [tuple(seq["M #"].tolist()) for seq in raw_sequences]
-    for i, sig in enumerate(all_signatures):
-        longer = any(set(sig).issubset(set(other)) and len(sig) < len(other) 
-                     for j, other in enumerate(all_signatures) if i != j)
-        if not longer:
-            filtered.append(raw_sequences[i])
+    filtered = [raw_sequences[i] for i in maximal_sequences(all_signatures)]
     return filtered
 
 def find_pairs(rows, seen_signatures):
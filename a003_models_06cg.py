@@ -1,6 +1,11 @@
-import streamlit as st
+try:
+    import streamlit as st
+except ImportError:  # headless use (a10_cli.py) only needs the detectors
+    st = None
 import pandas as pd
 from collections import defaultdict
+from a15_sequences import find_descent_paths, maximal_sequences, iter_output_groups, make_record, sequence_rows
+from a16_origin_classes import classification_codes, classify_A_sequence
 
 # Project file 3; Models, v6, A, B & C models ***
 # -----------------------
@@ -12,29 +17,6 @@ def feed_icon(feed):
 def sequence_signature(seq):
     return tuple(seq["M #"].tolist())
 
-def classify_A_model(row_0, prior_rows):
-    epic = {"trinidad", "tobago", "wasp-12b", "macedonia"}
-    anchor = {"spain", "saturn", "jupiter", "kepler-62", "kepler-44"}
-    t0 = row_0["Arrival"]
-    o0 = row_0["Origin"].lower()
-    time = "open" if t0.hour == 18 and t0.minute == 0 else \
-           "early" if (18 < t0.hour < 2 or (t0.hour == 1 and t0.minute < 59)) else "late"
-    is_epic = o0 in epic
-    is_anchor = o0 in anchor
-    prior = set(prior_rows["Origin"].str.lower())
-    strong = bool(prior & epic) or bool(prior & anchor)
-
-    if is_epic and time == "open": return "A01", "Open Epic 0"
-    if is_anchor and time == "open": return "A02", "Open Anchor 0"
-    if not is_anchor and time == "open" and strong: return "A03", "Open non-Anchor 0"
-    if not is_anchor and time == "early" and strong: return "A04", "Early non-Anchor 0"
-    if is_anchor and time == "late": return "A05", "Late Anchor 0"
-    if not is_anchor and time == "late" and strong: return "A06", "Late non-Anchor 0"
-    if not is_anchor and time == "open" and not strong: return "A07", "Open general 0"
-    if not is_anchor and time == "early" and not strong: return "A08", "Early general 0"
-    if not is_anchor and time == "late" and not strong: return "A09", "Late general 0"
-    return None, None
-
 def classify_B_model(seq):
     if len(seq) < 2: return None, None
     m_vals = seq["M #"].tolist()
@@ -68,53 +50,35 @@ def classify_time(t):
     else:
         return "Late"
 
+def find_C_candidates(subset, output, positions):
+    candidates = []
+    for i in range(len(subset) - 2):
+        seq = subset.iloc[i:i+3]
+        model, label = classify_C_model(seq)
+        if model:
+            candidates.append((sequence_signature(seq), model, make_record(model, label, output, seq, positions)))
+    return candidates
+
+# C hits are claimed after every A/B hit, in output order, as the separate C pass did
+def add_C_candidates(candidates, model_outputs, all_signatures):
+    for sig, model, result in candidates:
+        if sig in all_signatures:
+            continue
+        all_signatures.add(sig)
+        model_outputs[model].append(result)
+
 def detect_C_models(df, model_outputs, all_signatures):
-    for output in df["Output"].unique():
-        subset = df[df["Output"] == output].sort_values("Arrival").reset_index(drop=True)
-        for i in range(len(subset) - 2):
-            seq = subset.iloc[i:i+3]
-            sig = sequence_signature(seq)
-            if sig in all_signatures:
-                continue
-            model, label = classify_C_model(seq)
-            if model:
-                all_signatures.add(sig)
-                model_outputs[model].append({
-                    "label": label,
-                    "output": output,
-                    "timestamp": seq.iloc[-1]["Arrival"],
-                    "sequence": seq,
-                    "feeds": seq["Feed"].nunique()
-                })
+    candidates = []
+    for output, subset, positions in iter_output_groups(df):
+        candidates.extend(find_C_candidates(subset, output, positions))
+    add_C_candidates(candidates, model_outputs, all_signatures)
 
 
 def find_flexible_descents(rows):
-    raw_sequences = []
-    for i in range(len(rows)):
-        path = []
-        seen = set()
-        last_abs = float("inf")
-        for j in range(i, len(rows)):
-            m = rows.loc[j, "M #"]
-            abs_m = abs(m)
-            if m == 0:
-                if len(path) >= 2:
-                    path.append(j)
-                    raw_sequences.append(rows.loc[path])
-                break
-            if abs_m in seen or abs_m >= last_abs:
-                continue
-            path.append(j)
-            seen.add(abs_m)
-            last_abs = abs_m
-    filtered = []
-    all_signatures = [tuple(seq["M #"].tolist()) for seq in raw_sequences]
-    for i, sig in enumerate(all_signatures):
-        longer = any(set(sig).issubset(set(other)) and len(sig) < len(other) 
-                     for j, other in enumerate(all_signatures) if i != j)
-        if not longer:
-            filtered.append(raw_sequences[i])
-    return filtered
+    m = rows["M #"].to_numpy()
+    paths = find_descent_paths(m)
+    all_signatures = [tuple(m[path].tolist()) for path in paths]
+    return [rows.iloc[paths[i]] for i in maximal_sequences(all_signatures)]
 
 def find_pairs(rows, seen_signatures):
     pairs = []
@@ -131,67 +95,55 @@ def find_pairs(rows, seen_signatures):
             pairs.append(pair)
     return pairs
 
+def classify_A_rows(codes, rows):
+    return classify_A_sequence(codes["Time Bucket"][rows], codes["Origin Class"][rows])
+
+def detect_A_group(subset, output, positions, codes, model_outputs, all_signatures):
+    full_matches = find_flexible_descents(subset)
+
+    for seq in full_matches:
+        if seq.shape[0] < 3 or seq.iloc[-1]["M #"] != 0:
+            continue
+        sig = sequence_signature(seq)
+        if sig in all_signatures:
+            continue
+        all_signatures.add(sig)
+        model, label = classify_A_rows(codes, positions[seq.index.to_numpy()])
+        if model:
+            model_outputs[model].append(make_record(model, label, output, seq, positions))
+
+    pairs = find_pairs(subset, all_signatures)
+    for seq in pairs:
+        sig = sequence_signature(seq)
+        if sig in all_signatures:
+            continue
+        all_signatures.add(sig)
+        model, label = classify_A_rows(codes, positions[seq.index.to_numpy()])
+        if model:
+            pr_model = model + "pr"
+            model_outputs[pr_model].append(make_record(pr_model, f"Pair to {label}", output, seq, positions))
+        b_model, b_label = classify_B_model(seq)
+        if b_model:
+            pr_model = b_model + "pr"
+            model_outputs[pr_model].append(make_record(pr_model, f"Pair to {b_label}", output, seq, positions))
+
+# ✅ One pass over the (Output, Arrival)-sorted report: A and B pairs per slice, C collected alongside
+# A models are classified from per-row codes computed once for the whole report.
 def detect_A_models(df):
     report_time = df["Arrival"].max()
     model_outputs = defaultdict(list)
     all_signatures = set()
+    c_candidates = []
+    codes = classification_codes(df)
 
-    for output in df["Output"].unique():
-        subset = df[df["Output"] == output].sort_values("Arrival").reset_index(drop=True)
-        full_matches = find_flexible_descents(subset)
+    for output, subset, positions in iter_output_groups(df):
+        detect_A_group(subset, output, positions, codes, model_outputs, all_signatures)
+        c_candidates.extend(find_C_candidates(subset, output, positions))
 
-        for seq in full_matches:
-            if seq.shape[0] < 3 or seq.iloc[-1]["M #"] != 0:
-                continue
-            sig = sequence_signature(seq)
-            if sig in all_signatures:
-                continue
-            all_signatures.add(sig)
-            prior = seq.iloc[:-1]
-            last = seq.iloc[-1]
-            model, label = classify_A_model(last, prior)
-            if model:
-                model_outputs[model].append({
-                    "label": label,
-                    "output": output,
-                    "timestamp": last["Arrival"],
-                    "sequence": seq,
-                    "feeds": seq["Feed"].nunique()
-                })
-
-        pairs = find_pairs(subset, all_signatures)
-        for seq in pairs:
-            sig = sequence_signature(seq)
-            if sig in all_signatures:
-                continue
-            all_signatures.add(sig)
-            prior = seq.iloc[:-1]
-            last = seq.iloc[-1]
-            model, label = classify_A_model(last, prior)
-            if model:
-                pr_model = model + "pr"
-                model_outputs[pr_model].append({
-                    "label": f"Pair to {label}",
-                    "output": output,
-                    "timestamp": last["Arrival"],
-                    "sequence": seq,
-                    "feeds": seq["Feed"].nunique()
-                })
-            b_model, b_label = classify_B_model(seq)
-            if b_model:
-                pr_model = b_model + "pr"
-                model_outputs[pr_model].append({
-                    "label": f"Pair to {b_label}",
-                    "output": output,
-                    "timestamp": last["Arrival"],
-                    "sequence": seq,
-                    "feeds": seq["Feed"].nunique()
-                })
-
-    detect_C_models(df, model_outputs, all_signatures)
+    add_C_candidates(c_candidates, model_outputs, all_signatures)
     return model_outputs, report_time
 
-def show_a_model_results(model_outputs, report_time):
+def show_a_model_results(model_outputs, report_time, df):
     base_labels = {
         "A01": "Open Epic 0", "A02": "Open Anchor 0", "A03": "Open non-Anchor 0",
         "A04": "Early non-Anchor 0", "A05": "Late Anchor 0", "A06": "Late non-Anchor 0",
@@ -213,8 +165,9 @@ def show_a_model_results(model_outputs, report_time):
             header = f"{key}. {title} – {output_count} output{'s' if output_count != 1 else ''}"
 
             with st.expander(header):
-                today_results = [r for r in results if "[0]" in r["sequence"].iloc[-1]["Day"]]
-                other_results = [r for r in results if "[0]" not in r["sequence"].iloc[-1]["Day"]]
+                last_days = df["Day"].to_numpy()[[r["rows"][-1] for r in results]]
+                today_results = [r for r, day in zip(results, last_days) if "[0]" in str(day)]
+                other_results = [r for r, day in zip(results, last_days) if "[0]" not in str(day)]
 
                 def render_group(name, group):
                     st.markdown(f"#### {name}")
@@ -230,9 +183,9 @@ def show_a_model_results(model_outputs, report_time):
 
                         with st.expander(subhead):
                             for res in items:
-                                seq = res["sequence"]
-                                m_path = " → ".join([f"|{row['M #']}|" for _, row in seq.iterrows()])
-                                icons = "".join([feed_icon(row["Feed"]) for _, row in seq.iterrows()])
+                                seq = sequence_rows(df, res)
+                                m_path = " → ".join(f"|{m}|" for m in seq["M #"].tolist())
+                                icons = "".join(feed_icon(str(feed)) for feed in seq["Feed"].tolist())
                                 st.markdown(f"{m_path} Cross [{icons}]")
                                 st.table(seq.reset_index(drop=True))
 
@@ -245,5 +198,5 @@ def show_a_model_results(model_outputs, report_time):
 
 def run_a_model_detection(df):
     model_outputs, report_time = detect_A_models(df)
-    show_a_model_results(model_outputs, report_time)
+    show_a_model_results(model_outputs, report_time, df)
     return model_outputs
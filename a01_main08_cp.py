@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
 import datetime as dt
-from a02_utils import normalize_timestamp, get_most_recent_time, get_input_value, process_feed
-from a003_models_01cp import run_a_model_detection
-from a003_models_01cp import run_b_model_detection
-from a04_feed_sanitizer_01 import sanitize_feed, validate_feed
+from a02_utils import normalize_timestamp, get_most_recent_time, get_input_value, process_feed_report, concat_traveler_reports, compile_origin_schema, compact_traveler_report
+from a003_models_01cp import detect_A_models, show_a_model_results
+from a003_models_01cp import detect_B_models, show_b_model_results
+from a04_feed_sanitizer_01 import validate_feed, get_feed_profile, profile_frame
+from a05_incremental import process_feed_incremental
+from a06_feed_cache import load_feed, feed_key
+from a07_parallel import process_feeds_parallel
+from a09_measurement_store import load_measurement_store
+from a12_spans import span, enable_spans, reset_spans, render_span_panel
+from a13_stage_memo import memoize_stage, clear_stage_memo, stage_memo_stats
 
 # 🔌 Streamlit interface (UI + orchestration)
 
@@ -38,91 +44,150 @@ scope_value = st.number_input(f"Enter number of {scope_type.lower()}", min_value
 run_a_models = st.sidebar.checkbox("Run A Model Detection")
 run_b_models = st.sidebar.checkbox("Run B Model Detection")
 
+# ♻️ Reuse change detection from the previous upload of the same feeds
+incremental = st.sidebar.checkbox("Incremental processing (appended rows only)")
+# 🧵 Shard feeds × origin groups across a persistent worker pool
+parallel = st.sidebar.checkbox("Parallel processing (worker pool)", disabled=incremental)
+# 📦 Categoricals / float32 / int8 report columns (Output stays float64)
+compact_report = st.sidebar.checkbox("Compact report dtypes")
+# ⏱️ Per-stage wall time / rows (+ peak memory, slower) in a sidebar panel
+record_timings = st.sidebar.checkbox("Record pipeline timings")
+track_memory = st.sidebar.checkbox("Track peak memory", disabled=not record_timings)
+enable_spans(record_timings, track_memory=track_memory)
+reset_spans()
+# 🧠 Stage results are reused across reruns until their inputs change
+if st.sidebar.button("♻️ Clear cached stages"):
+    clear_stage_memo()
+
 # 🧠 Process feeds if ready
 if small_feed_file and big_feed_file and measurement_file:
     try:
-        # 🧼 Clean feeds
-        small_df = sanitize_feed(pd.read_csv(small_feed_file))
-        big_df   = sanitize_feed(pd.read_csv(big_feed_file))
+        # 🧼 Clean feeds (memoized in memory, Parquet-cached on disk, both by upload content hash)
+        small_key, big_key = feed_key(small_feed_file), feed_key(big_feed_file)
+        with span("load feed Sm") as s:
+            small_df = memoize_stage("feed", (small_key,), lambda: load_feed(small_feed_file))
+            s.rows = len(small_df)
+        with span("load feed Bg") as s:
+            big_df   = memoize_stage("feed", (big_key,), lambda: load_feed(big_feed_file))
+            s.rows = len(big_df)
 
         # 🔍 Optional feed checks
-        for label, df in [("Small Feed", small_df), ("Big Feed", big_df)]:
-            issues = validate_feed(df)
+        for label, df, key in [("Small Feed", small_df, small_key), ("Big Feed", big_df, big_key)]:
+            with span(f"validate {label}", rows=len(df)):
+                issues = memoize_stage("validate", (key,), lambda: validate_feed(df))
             if issues:
                 st.warning(f"Sanitizer flagged issues in {label}:")
                 for msg in issues:
                     st.markdown(f"- {msg}")
+            with st.expander(f"📋 {label} profile"):
+                profile = get_feed_profile(df)
+                if profile["time"]:
+                    st.json(profile["time"], expanded=False)
+                st.dataframe(profile_frame(profile), hide_index=True)
+            malformed = compile_origin_schema(tuple(df.columns)).malformed
+            if malformed:
+                st.warning(f"Origin groups skipped in {label} (need exactly H/L/C):")
+                for origin, cols in malformed.items():
+                    st.markdown(f"- {origin}: {', '.join(cols)}")
 
         # 📈 Measurements
-        xls = pd.ExcelFile(measurement_file)
-        sheet_choice = st.selectbox("Select measurement tab", xls.sheet_names)
-        measurements = pd.read_excel(measurement_file, sheet_name=sheet_choice)
-        measurements.columns = measurements.columns.str.strip().str.lower()
+        with span("measurements"):
+            measurement_store = load_measurement_store(measurement_file)
+        sheet_choice = st.selectbox("Select measurement tab", measurement_store["sheet_names"])
+        measurements = measurement_store["sheets"][sheet_choice]
 
         # ⏱️ Set report time (if not already chosen)
         if report_mode == "Most Current":
             report_time = normalize_timestamp(max(small_df["time"].max(), big_df["time"].max()))
 
-        
+        # 🔑 Everything the traveler report depends on (processing mode does not change it)
+        report_key = (small_key, big_key, measurement_store["hash"], sheet_choice, report_time,
+                      scope_type, scope_value, day_start_hour, filter_future_data)
+
+        # 🧱 Filter → Input → typed report (float64 numbers, datetime64 Arrival, categorical labels)
+        def build_report():
+            small_view, big_view = small_df, big_df
+            if filter_future_data and report_time:
+                small_view = small_df[small_df["time"] <= report_time]
+                big_view = big_df[big_df["time"] <= report_time]
+            result = {"counts": (len(small_view), len(small_df), len(big_view), len(big_df)), "final_df": None}
+
+            input_value = get_input_value(small_view, report_time)
+            if input_value is None:
+                input_value = get_input_value(big_view, report_time)
+            result["input_value"] = input_value
+            if report_time is None or input_value is None:
+                return result
+
+            if parallel and not incremental:
+                final_df = process_feeds_parallel([(small_view, "Sm"), (big_view, "Bg")], report_time, scope_type, scope_value, day_start_hour, measurements, input_value)
+            elif incremental:
+                final_df = concat_traveler_reports([
+                    process_feed_incremental(small_view, "Sm", report_time, scope_type, scope_value, day_start_hour, measurements, input_value),
+                    process_feed_incremental(big_view, "Bg", report_time, scope_type, scope_value, day_start_hour, measurements, input_value),
+                ])
+            else:
+                final_df = concat_traveler_reports([
+                    process_feed_report(small_view, "Sm", report_time, scope_type, scope_value, day_start_hour, measurements, input_value, compact=compact_report),
+                    process_feed_report(big_view, "Bg", report_time, scope_type, scope_value, day_start_hour, measurements, input_value, compact=compact_report),
+                ])
+            if compact_report and (parallel or incremental):
+                final_df = compact_traveler_report(final_df)
+            final_df.sort_values(by=["Output", "Arrival"], ascending=[False, True], inplace=True)
+            # Detectors take the datetime Arrival; the table / CSV show it formatted
+            display_df = final_df.assign(Arrival=final_df["Arrival"].dt.strftime("%#d-%b-%y %H:%M"))
+            result.update(final_df=final_df, display_df=display_df, csv=display_df.to_csv(index=False).encode())
+            return result
+
+        with span("process feeds", rows=len(small_df) + len(big_df)):
+            report = memoize_stage("report", report_key + (compact_report,), build_report)
+
         # ✅ Filter feeds to exclude data after report_time
         if filter_future_data and report_time:
-            before_small = len(small_df)
-            before_big = len(big_df)
-            small_df = small_df[small_df["time"] <= report_time]
-            big_df = big_df[big_df["time"] <= report_time]
-            st.info(f"🔒 Filtered data to report time: Small Feed ({len(small_df)}/{before_small}), Big Feed ({len(big_df)}/{before_big})")
+            kept_small, before_small, kept_big, before_big = report["counts"]
+            st.info(f"🔒 Filtered data to report time: Small Feed ({kept_small}/{before_small}), Big Feed ({kept_big}/{before_big})")
         elif report_time:
             st.warning("⚠️ Future data beyond the Report Time is included.")
 
         # 📌 Confirm Report Time
         st.success(f"✅ Using report time: {report_time.strftime('%d-%b-%y %H:%M')}")
 
-        # 🧮 Input value
-        input_value = get_input_value(small_df, report_time)
-        if input_value is None:
-            input_value = get_input_value(big_df, report_time)
-
+        input_value = report["input_value"]
         if report_time is None or input_value is None:
             st.error("⚠️ Could not determine Report Time or Input Value.")
         else:
             st.success(f"✅ Input value: {input_value:.3f}")
+            final_df = report["final_df"]
 
-            results = []
-            results += process_feed(small_df, "Sm", report_time, scope_type, scope_value, day_start_hour, measurements, input_value)
-            results += process_feed(big_df, "Bg", report_time, scope_type, scope_value, day_start_hour, measurements, input_value)
-
-            final_df = pd.DataFrame(results)
-            final_df.sort_values(by=["Output", "Arrival"], ascending=[False, True], inplace=True) 
-            final_df["Arrival"] = pd.to_datetime(final_df["Arrival"]).dt.strftime("%#d-%b-%y %H:%M")
-            final_df["Day"] = final_df["Day"].astype(str)
-            
-            # 👮 Enforce numeric types to prevent detection issues
-            final_df["Output"] = pd.to_numeric(final_df["Output"], errors="coerce")
-            final_df["M #"] = pd.to_numeric(final_df["M #"], errors="coerce")
-            final_df["Input"] = pd.to_numeric(final_df["Input"], errors="coerce")
-
-            st.subheader("📊 Final Traveler Report")
-            st.dataframe(final_df)
+            with span("render report", rows=len(final_df)):
+                st.subheader("📊 Final Traveler Report")
+                st.dataframe(report["display_df"])
 
             timestamp_str = report_time.strftime("%y-%m-%d_%H-%M")
             filename = f"origin_report_{timestamp_str}.csv"
-            st.download_button("📥 Download Report CSV", data=final_df.to_csv(index=False).encode(), file_name=filename, mime="text/csv")
+            st.download_button("📥 Download Report CSV", data=report["csv"], file_name=filename, mime="text/csv")
 
             # ✅ Run B Model Detection if selected
             if run_b_models:
                 st.markdown("---")
                 st.subheader("🤖 B Models")
-                # convert Arrival back to datetime
-                final_df["Arrival"] = pd.to_datetime(final_df["Arrival"], errors="coerce")
-                run_b_model_detection(final_df)    
+                with span("detect B models", rows=len(final_df)):
+                    b_outputs, b_report_time = memoize_stage("detect_B", report_key + (compact_report,), lambda: detect_B_models(final_df))
+                with span("render B models"):
+                    show_b_model_results(b_outputs, b_report_time, final_df)
             
             # ✅ Run A Model Detection if selected
             if run_a_models:
                 st.markdown("---")
                 st.subheader("🤖 A Model Detection Results")
-                # convert Arrival back to datetime
-                final_df["Arrival"] = pd.to_datetime(final_df["Arrival"], errors="coerce")
-                run_a_model_detection(final_df)
+                with span("detect A models", rows=len(final_df)):
+                    model_outputs, a_report_time = memoize_stage("detect_A", report_key + (compact_report,), lambda: detect_A_models(final_df))
+                with span("render A models"):
+                    show_a_model_results(model_outputs, a_report_time, final_df)
 
     except Exception as e:
         st.error(f"❌ Processing error: {e}")
+
+st.sidebar.caption("🧠 Stage cache: {hits} hits, {misses} misses, {entries} entries, {mb} MB".format(**stage_memo_stats()))
+render_span_panel(st, meta={"report_time": report_time, "scope_type": scope_type, "scope_value": scope_value,
+                            "incremental": incremental, "parallel": parallel, "compact_report": compact_report})
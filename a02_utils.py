@@ -1,8 +1,29 @@
 # utils.py
 
+import os
+import numpy as np
 import pandas as pd
 import datetime as dt
+import weakref
+from collections import namedtuple
+from functools import lru_cache
 from dateutil import parser
+from pandas.api.types import union_categoricals
+from pandas.tseries.api import guess_datetime_format
+
+# Trailing UTC offset / zone after a clock time, e.g. "18:00:00-05:00", "18:00Z"
+TZ_SUFFIX = r"(\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|GMT|[+-]\d{2}:?\d{2})$"
+
+# ✅ Raw bytes of an upload: Streamlit UploadedFile, file path, open file or bytes
+def upload_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            return fh.read()
+    return source.read()
 
 # ✅ Normalize any timestamp to naive datetime (removes timezone)
 def normalize_timestamp(ts):
@@ -23,19 +44,128 @@ def clean_timestamp(ts):
         return dt_obj.replace(tzinfo=None)
     return pd.to_datetime(ts, errors="coerce")
 
+# Junk cells (footers, stray text) become NaT, as the old pd.to_datetime(errors="coerce") gave
+def _clean_timestamp_or_nat(ts):
+    try:
+        return clean_timestamp(ts)
+    except (ValueError, OverflowError, parser.ParserError):
+        return pd.NaT
+
+# ✅ Bulk timestamp parsing: detect the format once, parse the whole column, drop timezone
+# Keeps local wall time like clean_timestamp; cells the detected format misses fall back to it.
+def parse_time_column(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.tz_localize(None) if values.dt.tz is not None else values
+    if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+        return pd.to_datetime(values, errors="coerce")
+    wall = values.where(values.map(type) == str).str.strip().str.replace(TZ_SUFFIX, r"\1", regex=True)
+    blank = wall == ""  # empty / whitespace-only cells are missing, not unparseable
+    wall = wall.mask(blank)
+    sample = wall.dropna()
+    fmt = guess_datetime_format(sample.iloc[0]) if not sample.empty else None
+    if fmt:
+        parsed = pd.to_datetime(wall, format=fmt, errors="coerce")
+    else:
+        parsed = pd.to_datetime(wall, format="mixed", errors="coerce")
+    missed = parsed.isna() & values.notna() & ~blank
+    if missed.any():
+        parsed = parsed.astype(object)
+        parsed[missed] = values[missed].apply(_clean_timestamp_or_nat)
+        parsed = pd.to_datetime(parsed, errors="coerce")
+    return parsed
+
+# ✅ Parse a feed's "time" column once and mark it so later stages skip it
+def normalize_feed_times(df):
+    if not is_time_parsed(df):
+        df["time"] = parse_time_column(df["time"])
+        df.attrs["time_parsed"] = True
+    return df
+
+def is_time_parsed(df):
+    if df.attrs.get("time_parsed"):
+        return True
+    return "time" in df.columns and pd.api.types.is_datetime64_dtype(df["time"])
+
 # ✅ Get most recent time from feed
 def get_most_recent_time(df):
     return df["time"].max()
 
-# ✅ Get input value for a given report_time
+# ✅ Get input value for a given report_time (open of the last row at that time)
 def get_input_value(df, report_time):
-    match = df[df["time"] == report_time]
-    return match.iloc[-1]["open"] if not match.empty and "open" in match.columns else None
+    if report_time is None or "open" not in df.columns:
+        return None
+    if not pd.api.types.is_datetime64_dtype(df["time"]):
+        match = df[df["time"] == report_time]
+        return match.iloc[-1]["open"] if not match.empty else None
+    at = rows_at(get_time_index(df), report_time)
+    return df["open"].iloc[at[-1]] if len(at) else None
 
-# ✅ Extract origin column groups
-def extract_origins(columns):
-    origins = {}
-    for col in columns:
+# ✅ Sorted time index: built once per feed object, answers time lookups by binary search
+# order: chronological positions sorted by time (NaT last); n_valid: non-NaT count
+# ordered: every time present and non-decreasing, so any time window is one block of rows
+TimeIndex = namedtuple("TimeIndex", ["n", "order", "sorted_times", "n_valid", "bounds", "ordered"])
+_TIME_INDEX_CACHE = {}
+
+def build_time_index(df):
+    times = df["time"].to_numpy().astype("datetime64[ns]")
+    n_valid = int((~np.isnat(times)).sum())
+    monotonic = n_valid == len(times) and bool((times[1:] >= times[:-1]).all())
+    order = np.arange(len(times)) if monotonic else np.argsort(times, kind="stable")
+    bounds = (times[0], times[-1]) if len(times) else None
+    return TimeIndex(len(times), order, times[order][:n_valid], n_valid, bounds, monotonic)
+
+def get_time_index(df):
+    key = id(df)
+    index = _TIME_INDEX_CACHE.get(key)
+    times = df["time"].to_numpy()
+    bounds = (times[0], times[-1]) if len(times) else None
+    if index is not None and index.n == len(df) and _same_bounds(index.bounds, bounds):
+        return index
+    index = build_time_index(df)
+    _TIME_INDEX_CACHE[key] = index
+    weakref.finalize(df, _TIME_INDEX_CACHE.pop, key, None)
+    return index
+
+def _same_bounds(a, b):
+    if a is None or b is None:
+        return a is b
+    return all(np.datetime64(x, "ns") == np.datetime64(y, "ns") or (np.isnat(np.datetime64(x, "ns")) and np.isnat(np.datetime64(y, "ns")))
+               for x, y in zip(a, b))
+
+def _as_datetime64(t):
+    return pd.Timestamp(t).to_datetime64().astype("datetime64[ns]")
+
+# Chronological positions of rows whose time == t (ascending)
+def rows_at(index, t):
+    t = _as_datetime64(t)
+    lo = np.searchsorted(index.sorted_times, t, side="left")
+    hi = np.searchsorted(index.sorted_times, t, side="right")
+    return np.sort(index.order[lo:hi])
+
+# Chronological positions of rows whose time >= cutoff (ascending)
+def rows_from(index, cutoff):
+    k = np.searchsorted(index.sorted_times, _as_datetime64(cutoff), side="left")
+    return np.sort(index.order[k:index.n_valid])
+
+# ✅ Compiled origin schema: one entry per H/L/C group, with column positions
+OriginSpec = namedtuple("OriginSpec", ["name", "cols", "positions", "bracket", "kind"])
+OriginSchema = namedtuple("OriginSchema", ["origins", "malformed"])
+SPECIAL_ORIGIN_KINDS = ["wasp", "macedonia"]
+
+def _bracket_number(origin_name):
+    if "[" in origin_name and "]" in origin_name:
+        try:
+            return int(origin_name.split("[")[-1].replace("]", ""))
+        except ValueError:
+            return 0
+    return 0
+
+# ✅ Built once per distinct header tuple and reused across reruns / feeds
+@lru_cache(maxsize=64)
+def compile_origin_schema(columns):
+    groups = {}
+    for position, col in enumerate(columns):
         col = col.strip().lower()
         if col in ["time", "open"]:
             continue
@@ -46,13 +176,165 @@ def extract_origins(columns):
             core = col.replace(" h", "").replace(" l", "").replace(" c", "")
             if bracket and not core.endswith(bracket):
                 core += bracket
-            origins.setdefault(core, []).append(col)
-    return {origin: cols for origin, cols in origins.items() if len(cols) == 3}
+            groups.setdefault(core, []).append((col, position))
+    origins, malformed = {}, {}
+    for core, members in groups.items():
+        cols = tuple(col for col, _ in members)
+        if len(members) != 3:
+            malformed[core] = cols
+            continue
+        kind = next((tag for tag in SPECIAL_ORIGIN_KINDS if tag in core), None)
+        origins[core] = OriginSpec(core, cols, tuple(pos for _, pos in members), _bracket_number(core), kind)
+    return OriginSchema(origins, malformed)
+
+# ✅ Extract origin column groups
+def extract_origins(columns):
+    schema = compile_origin_schema(tuple(columns))
+    return {origin: list(spec.cols) for origin, spec in schema.origins.items()}
+
+# ✅ Find changed rows in one shift/compare pass
+# values: H/L/C block, newest row first. Returns positions i where row i differs from row i+1.
+def find_changed_rows(values):
+    values = np.asarray(values)
+    if len(values) < 2:
+        return np.empty(0, dtype=np.intp)
+    changed = (values[:-1] != values[1:]).any(axis=1)
+    return np.flatnonzero(changed)
+
+# ✅ Feed newest row first, with its times and a "time and open present" mask
+def newest_first(df):
+    reversed_df = df.iloc[::-1]
+    times = reversed_df["time"].to_numpy()
+    return reversed_df, times, pd.notna(times) & reversed_df["open"].notna().to_numpy()
+
+# ✅ Change rows of one plain origin: arrivals and H/L/C of valid rows that differ from the row before
+def origin_changes(reversed_df, times, row_valid, spec):
+    block = reversed_df.iloc[:, list(spec.positions)].to_numpy()
+    valid = row_valid & pd.notna(block).all(axis=1)
+    block, origin_times = block[valid], times[valid]
+    changed = find_changed_rows(block)
+    return origin_times[changed], block[changed].astype(float)
 
 # ✅ Calculate pivot output
 def calculate_pivot(H, L, C, M_value):
     return ((H + L + C) / 3) + M_value * (H - L)
 
+# ✅ Broadcast pivot outputs for every (changed row × measurement) pair
+def calculate_pivot_matrix(H, L, C, m_values):
+    H, L, C = (np.asarray(x, dtype=float)[:, None] for x in (H, L, C))
+    m_values = np.asarray(m_values, dtype=float)[None, :]
+    return calculate_pivot(H, L, C, m_values)
+
+# ✅ Traveler report column layout
+REPORT_COLUMNS = ["Feed", "Arrival", "Origin", "M Name", "M #", "R #", "Tag", "Family", "Input", "Output", "Diff", "Day"]
+CATEGORY_COLUMNS = ["Feed", "Origin", "Tag", "Family", "Day"]
+
+# ✅ Repeat / tile a categorical through its integer codes (no per-row Python objects)
+def _repeat_category(value, n):
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[value])
+
+def _tile_category(values, n_rows):
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, categories = pd.factorize(values, use_na_sentinel=True)
+    return pd.Categorical.from_codes(np.tile(codes, n_rows), categories=categories)
+
+# ✅ Build traveler report columns for one origin in one broadcast
+# outputs: optional precomputed (rows × measurements) pivot matrix, e.g. shared across report times
+def build_traveler_columns(feed_type, origin, arrivals, H, L, C, measurements, input_value, report_time, start_hour,
+                           outputs=None):
+    n_rows, n_meas = len(arrivals), len(measurements)
+    if outputs is None:
+        outputs = calculate_pivot_matrix(H, L, C, measurements["m value"].to_numpy())
+    outputs = np.asarray(outputs, dtype=np.float64).ravel()
+    arrivals = pd.DatetimeIndex(pd.to_datetime(arrivals, errors="coerce"))
+    days = get_day_indices(arrivals, report_time, start_hour)
+    return {
+        "Feed": _repeat_category(feed_type, n_rows * n_meas),
+        "Arrival": np.repeat(arrivals.to_numpy(dtype="datetime64[ns]"), n_meas),
+        "Origin": _repeat_category(origin, n_rows * n_meas),
+        "M Name": np.tile(measurements["m name"].to_numpy(), n_rows),
+        "M #": np.tile(measurements["m #"].to_numpy(dtype=np.float64), n_rows),
+        "R #": np.tile(measurements["r #"].to_numpy(), n_rows),
+        "Tag": _tile_category(measurements["tag"], n_rows),
+        "Family": _tile_category(measurements["family"], n_rows),
+        "Input": np.full(n_rows * n_meas, float(input_value), dtype=np.float64),
+        "Output": outputs,
+        "Diff": outputs - float(input_value),
+        "Day": pd.Categorical.from_codes(np.repeat(days.codes, n_meas), categories=days.categories),
+    }
+
+# ✅ Assemble column chunks into one typed traveler report DataFrame
+def build_traveler_report(column_chunks, compact=False):
+    if not column_chunks:
+        return empty_traveler_report()
+    data = {}
+    for key in REPORT_COLUMNS:
+        parts = [chunk[key] for chunk in column_chunks]
+        if key in CATEGORY_COLUMNS:
+            data[key] = union_categoricals(parts)
+        else:
+            data[key] = np.concatenate(parts)
+    report = pd.DataFrame(data)
+    return compact_traveler_report(report) if compact else report
+
+# 📦 Compact dtype profile (opt-in) – precision contract
+#   Output          float64, never narrowed: detectors group travelers by exact Output
+#                   equality, and float32 would merge outputs that differ past ~7 digits.
+#   Input, Diff     float32 (~7 significant digits) – display / sorting only.
+#   M #, R #        int8 / int16 when every value is integral and fits, otherwise unchanged,
+#                   so M # comparisons (== 0, |M #| ordering, signatures) are exact either way.
+#   Arrival         datetime64[ns].
+#   Feed, Origin, M Name, Tag, Family, Day   categorical.
+COMPACT_CATEGORY_COLUMNS = CATEGORY_COLUMNS + ["M Name"]
+
+def _smallest_int(values):
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    if not len(values) or not np.isfinite(values).all() or (values != np.round(values)).any():
+        return None
+    for dtype in (np.int8, np.int16):
+        info = np.iinfo(dtype)
+        if values.min() >= info.min and values.max() <= info.max:
+            return values.astype(dtype)
+    return None
+
+def compact_traveler_report(report):
+    report = report.copy()
+    for key in ["Input", "Diff"]:
+        if key in report.columns:
+            report[key] = report[key].astype(np.float32)
+    for key in ["M #", "R #"]:
+        if key in report.columns:
+            narrowed = _smallest_int(report[key])
+            if narrowed is not None:
+                report[key] = narrowed
+    if "Arrival" in report.columns:
+        report["Arrival"] = pd.to_datetime(report["Arrival"], errors="coerce").astype("datetime64[ns]")
+    for key in COMPACT_CATEGORY_COLUMNS:
+        if key in report.columns and not isinstance(report[key].dtype, pd.CategoricalDtype):
+            report[key] = report[key].astype("category")
+    return report
+
+def empty_traveler_report():
+    report = pd.DataFrame({key: pd.Series(dtype=np.float64) for key in REPORT_COLUMNS})
+    report["Arrival"] = pd.Series(dtype="datetime64[ns]")
+    for key in CATEGORY_COLUMNS:
+        report[key] = pd.Series(dtype="category")
+    return report
+
+# ✅ Concatenate several traveler reports (e.g. Sm + Bg) keeping categoricals
+def concat_traveler_reports(reports):
+    reports = [r for r in reports if not r.empty]
+    if not reports:
+        return empty_traveler_report()
+    combined = pd.concat(reports, ignore_index=True)
+    for key in combined.columns:
+        if all(isinstance(r[key].dtype, pd.CategoricalDtype) for r in reports):
+            combined[key] = union_categoricals([r[key] for r in reports])
+    return combined
+
 # ✅ Get day index label
 def get_day_index(arrival, report_time, start_hour):
     if not report_time:
@@ -63,6 +345,25 @@ def get_day_index(arrival, report_time, start_hour):
     days_diff = (arrival - report_day_start) // dt.timedelta(days=1)
     return f"[{int(days_diff)}]"
 
+# ✅ Vectorized day labels for a whole Arrival array (same buckets as get_day_index)
+def get_day_indices(arrivals, report_time, start_hour):
+    arrivals = pd.DatetimeIndex(arrivals).to_numpy(dtype="datetime64[ns]")
+    if not report_time:
+        return pd.Categorical.from_codes(np.zeros(len(arrivals), dtype=np.int8), categories=["[0] Today"])
+    report_day_start = report_time.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    if report_time.hour < start_hour:
+        report_day_start -= dt.timedelta(days=1)
+    days_diff = (arrivals - np.datetime64(report_day_start, "ns")) // np.timedelta64(1, "D")
+    values, codes = np.unique(days_diff, return_inverse=True)
+    return pd.Categorical.from_codes(codes.ravel(), categories=[f"[{int(d)}]" for d in values])
+
+# ✅ Memoized WASP / Macedonia anchor for (kind, bracket, report_time, start_hour)
+@lru_cache(maxsize=1024)
+def get_special_anchor(kind, bracket, report_time, start_hour):
+    if kind == "wasp":
+        return get_weekly_anchor(report_time, max(1, bracket), start_hour)
+    return get_monthly_anchor(report_time, max(1, bracket), start_hour)
+
 # ✅ Calculate weekly anchor time
 def get_weekly_anchor(report_time, weeks_back, start_hour):
     days_since_sunday = (report_time.weekday() + 1) % 7
@@ -78,108 +379,141 @@ def get_monthly_anchor(report_time, months_back, start_hour):
         year -= 1
     return dt.datetime(year, month, 1, hour=start_hour, minute=0, second=0, microsecond=0)
 
-# ✅ Main feed processor function
-def process_feed(df, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value):
-    df.columns = df.columns.str.strip().str.lower()
-    df["time"] = df["time"].apply(clean_timestamp)
-    df = df.iloc[::-1]  # reverse chronological
-
-    if report_time:
-        if scope_type == "Rows":
-            try:
-                start_index = df[df["time"] == report_time].index[0]
-                df = df.iloc[start_index:start_index + scope_value]
-            except:
-                pass
+# ✅ Report scope as chronological row positions (None = no trim)
+# "Rows" uses the report row's index label as a start position in the reversed feed
+# (as it always has): reversed rows [s, s + scope) ↔ chronological rows [n - s - scope, n - 1 - s].
+def scope_positions(df, index, report_time, scope_type, scope_value):
+    if not report_time:
+        return None
+    if scope_type == "Rows":
+        at = rows_at(index, report_time)
+        if not len(at):
+            return None
+        start_index = df.index[at[-1]]
+        if not isinstance(start_index, (int, np.integer)):
+            return None
+        lo, hi = max(index.n - int(start_index) - int(scope_value), 0), index.n - 1 - int(start_index)
+        return np.arange(lo, hi + 1) if hi >= lo else np.empty(0, dtype=np.intp)
+    return rows_from(index, report_time - pd.Timedelta(days=scope_value))
+
+def _take_rows(df, positions):
+    if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+        return df.iloc[positions[0]:positions[-1] + 1]
+    return df.iloc[positions]
+
+# ✅ Trim a chronological feed to the report scope
+# Returns (scoped feed, positions of the report_time rows inside it)
+def scope_feed(df, report_time, scope_type, scope_value, already_scoped=False):
+    index = get_time_index(df)
+    report_at = rows_at(index, report_time) if report_time else np.empty(0, dtype=np.intp)
+    keep = None if already_scoped else scope_positions(df, index, report_time, scope_type, scope_value)
+    if keep is None:
+        return df, report_at
+    report_at = np.searchsorted(keep, report_at[np.isin(report_at, keep)])
+    return _take_rows(df, keep), report_at
+
+# ✅ H/L/C of the latest valid report_time row for one origin (WASP / Macedonia)
+def report_row_hlc(df, report_at, spec):
+    if not len(report_at):
+        return None
+    rows = df.iloc[report_at[::-1]]
+    block = rows.iloc[:, list(spec.positions)].to_numpy()
+    valid = rows["time"].notna().to_numpy() & rows["open"].notna().to_numpy() & pd.notna(block).all(axis=1)
+    hit = np.flatnonzero(valid)
+    return block[hit[:1]].astype(float) if len(hit) else None
+
+def scope_key(report_time, scope_type, scope_value):
+    if not report_time:
+        return None
+    return (pd.Timestamp(report_time), scope_type, int(scope_value))
+
+def _prepare_chunk(chunk):
+    chunk.columns = chunk.columns.str.strip().str.lower()
+    return normalize_feed_times(chunk)
+
+# ✅ Streaming CSV reader that applies the report_time / scope window while reading
+# Keeps the original row labels, so "Rows" mode resolves the same start index as a full read.
+# The result is marked with its scope so process_feed_report does not trim it again.
+# In "Rows" mode the report row's open is kept as attrs["report_open"] (Input value).
+def read_feed_scoped(path, report_time, scope_type, scope_value, chunksize=100_000, prepare=_prepare_chunk):
+    if not report_time:
+        return prepare(pd.read_csv(path))
+
+    if scope_type == "Rows":
+        header = pd.read_csv(path, nrows=0).columns
+        time_col = next(col for col in header if col.strip().lower() == "time")
+        open_col = next((col for col in header if col.strip().lower() == "open"), None)
+        n_rows, last_match, report_open = 0, None, None
+        for chunk in pd.read_csv(path, usecols=[c for c in (time_col, open_col) if c], chunksize=chunksize):
+            matches = np.flatnonzero(parse_time_column(chunk[time_col]).to_numpy() == np.datetime64(report_time))
+            if len(matches):
+                last_match = n_rows + matches[-1]
+                if open_col:
+                    report_open = chunk[open_col].iloc[matches[-1]]
+            n_rows += len(chunk)
+        if last_match is None:
+            return prepare(pd.read_csv(path))  # no report row → no trim, same as scope_feed
+        # Reversed positions [start, start + scope) ↔ chronological rows [lo, hi]
+        start_index = last_match
+        hi = n_rows - 1 - start_index
+        lo = max(n_rows - start_index - scope_value, 0)
+        if hi < lo:
+            df = prepare(pd.read_csv(path, nrows=0))
         else:
-            cutoff = report_time - pd.Timedelta(days=scope_value)
-            df = df[df["time"] >= cutoff]
+            # Integer skip: pandas turns a skiprows range into a set of every skipped row number
+            df = prepare(pd.read_csv(path, skiprows=lo + 1, header=None, names=list(header), nrows=hi - lo + 1))
+            df.index = pd.RangeIndex(lo, hi + 1)
+        # The window rarely holds the report row itself; keep its open for the Input value
+        df.attrs["report_open"] = report_open
+    else:
+        cutoff = report_time - pd.Timedelta(days=scope_value)
+        kept = []
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk = prepare(chunk)
+            kept.append(chunk[chunk["time"] >= cutoff])
+        df = pd.concat(kept) if kept else prepare(pd.read_csv(path, nrows=0))
+        df.attrs["time_parsed"] = True
 
-    origins = extract_origins(df.columns)
-    new_data_rows = []
+    df.attrs["scope"] = scope_key(report_time, scope_type, scope_value)
+    return df
 
-    for origin, cols in origins.items():
-        relevant_rows = df[["time", "open"] + cols].dropna()
-        origin_name = origin.lower()
-        is_special = any(tag in origin_name for tag in ["wasp", "macedonia"])
+# ✅ Main feed processor function (records, kept for older main scripts)
+def process_feed(df, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value):
+    report = process_feed_report(df, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value)
+    for key in CATEGORY_COLUMNS:
+        report[key] = report[key].astype(object)
+    return report.to_dict("records")
+
+# ✅ Main feed processor function → typed traveler report DataFrame
+def process_feed_report(df, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value,
+                        compact=False):
+    df.columns = df.columns.str.strip().str.lower()
+    normalize_feed_times(df)
+    already_scoped = df.attrs.get("scope") == scope_key(report_time, scope_type, scope_value)
+    df, report_at = scope_feed(df, report_time, scope_type, scope_value, already_scoped)
+
+    schema = compile_origin_schema(tuple(df.columns))
+    reversed_df, times, row_valid = newest_first(df)
+    column_chunks = []
 
-        if is_special:
-            report_row = relevant_rows[relevant_rows["time"] == report_time]
-            if report_row.empty:
+    for origin, spec in schema.origins.items():
+        if spec.kind:
+            if report_time is None:
                 continue
-            current = report_row.iloc[0]
-            bracket_number = 0
-            if "[" in origin_name and "]" in origin_name:
-                try:
-                    bracket_number = int(origin_name.split("[")[-1].replace("]", ""))
-                except:
-                    pass
-            if "wasp" in origin_name:
-                arrival_time = get_weekly_anchor(report_time, max(1, bracket_number), start_hour)
-            elif "macedonia" in origin_name:
-                arrival_time = get_monthly_anchor(report_time, max(1, bracket_number), start_hour)
-            else:
-                arrival_time = report_time
-            H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
-            for _, row in measurements.iterrows():
-                output = calculate_pivot(H, L, C, row["m value"])
-                day = get_day_index(arrival_time, report_time, start_hour)
-                new_data_rows.append({
-                    "Feed": feed_type,
-                    "Arrival": arrival_time,
-                    "Origin": origin,
-                    "M Name": row["m name"],
-                    "M #": row["m #"],
-                    "R #": row["r #"],
-                    "Tag": row["tag"],
-                    "Family": row["family"],
-                    "Input": input_value,
-                    "Output": output,
-                    "Diff": output - input_value,
-                    "Day": day
-                })
+            hlc = report_row_hlc(df, report_at, spec)
+            if hlc is None:
+                continue
+            arrivals = [get_special_anchor(spec.kind, spec.bracket, pd.Timestamp(report_time), start_hour)]
+        else:
+            arrivals, hlc = origin_changes(reversed_df, times, row_valid, spec)
+        if not len(arrivals):
             continue
 
-        for i in range(len(relevant_rows) - 1):
-            current = relevant_rows.iloc[i]
-            above = relevant_rows.iloc[i + 1]
-            changed = any(current[col] != above[col] for col in cols)
-            if changed:
-                arrival_time = current["time"]
-                if is_special:
-                    bracket_number = 0
-                    if "[" in origin_name and "]" in origin_name:
-                        try:
-                            bracket_number = int(origin_name.split("[")[-1].replace("]", ""))
-                        except:
-                            pass
-                    if "wasp" in origin_name:
-                        arrival_time = get_weekly_anchor(report_time, max(1, bracket_number), start_hour)
-                    elif "macedonia" in origin_name:
-                        arrival_time = get_monthly_anchor(report_time, max(1, bracket_number), start_hour)
-                H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
-                for _, row in measurements.iterrows():
-                    output = calculate_pivot(H, L, C, row["m value"])
-                    day = get_day_index(arrival_time, report_time, start_hour)
-                    new_data_rows.append({
-                        "Feed": feed_type,
-                        "Arrival": arrival_time,
-                        "Origin": origin,
-                        "M Name": row["m name"],
-                        "M #": row["m #"],
-                        "R #": row["r #"],
-                        "Tag": row["tag"],
-                        "Family": row["family"],
-                        "Input": input_value,
-                        "Output": output,
-                        "Diff": output - input_value,
-                        "Day": day
-                    })
-    # ✅ Enforce type integrity on all final rows
-    for row in new_data_rows:
-        row["Output"] = float(row["Output"])
-        row["M #"] = float(row["M #"])
-        row["Input"] = float(row["Input"])
-        row["Arrival"] = pd.to_datetime(row["Arrival"], errors="coerce")
-
-    return new_data_rows
+        column_chunks.append(build_traveler_columns(
+            feed_type, origin, arrivals, hlc[:, 0], hlc[:, 1], hlc[:, 2],
+            measurements, input_value, report_time, start_hour
+        ))
+
+    report = build_traveler_report(column_chunks, compact=compact)
+    report.attrs["malformed_origins"] = dict(schema.malformed)
+    return report
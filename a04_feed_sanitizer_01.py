@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from a14_schemas import FEED_SCHEMA, apply_schema
 
 # 🧼 feed_sanitizer.py – Core Module (Version 1)
 
@@ -6,33 +8,103 @@ def sanitize_feed(df):
     # 🧹 Normalize column headers
     df.columns = df.columns.str.strip().str.lower()
 
-    # ⏱️ Parse datetime if present
-    if "time" in df.columns:
-        df["time"] = pd.to_datetime(df["time"], errors="coerce")
+    # ⏱️ Parse datetime / 🔢 force numeric fields (no-op for columns read_feed_csv already typed)
+    return apply_schema(df, FEED_SCHEMA)
 
-    # 🔢 Force numeric fields
-    numeric_fields = ["open", "output", "m #", "input"]
-    for col in numeric_fields:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+# 📋 Schema profile – one vectorized pass per feed
+#
+# Per column: dtype, null count and the fraction of non-null values that coerce to a
+# number. For the time column: monotonicity, duplicate timestamps and gaps (steps longer
+# than GAP_FACTOR × the median step). Plain dicts, so load_feed can store the profile
+# as JSON next to the cached Parquet file.
 
-    return df
+KEY_COLUMNS = ["m #", "output", "arrival"]
+GAP_FACTOR = 2
 
-def validate_feed(df):
-    df.columns = df.columns.str.strip().str.lower()  # ✅ normalize first
+def _numeric_fraction(values):
+    if pd.api.types.is_bool_dtype(values):
+        return 0.0
+    if pd.api.types.is_numeric_dtype(values):
+        return 1.0
+    if not pd.api.types.is_object_dtype(values) and not pd.api.types.is_string_dtype(values):
+        return 0.0  # datetimes, categoricals
+    present = values.dropna()
+    if present.empty:
+        return 0.0
+    return float(pd.to_numeric(present, errors="coerce").notna().mean())
+
+def _profile_time(times):
+    times = pd.to_datetime(times, errors="coerce")
+    valid = times.dropna().to_numpy(dtype="datetime64[ns]")
+    steps = np.diff(valid)
+    positive = steps[steps > np.timedelta64(0, "ns")]
+    median_step = np.median(positive.astype(np.int64)) if len(positive) else 0
+    gaps = positive[positive.astype(np.int64) > GAP_FACTOR * median_step] if median_step else positive[:0]
+    return {
+        "unparsed": int(times.isna().sum()),
+        "monotonic": bool((steps >= np.timedelta64(0, "ns")).all()),
+        "out_of_order": int((steps < np.timedelta64(0, "ns")).sum()),
+        "duplicates": int(pd.Series(valid).duplicated().sum()),
+        "median_step": str(pd.Timedelta(int(median_step))),
+        "gaps": int(len(gaps)),
+        "max_gap": str(pd.Timedelta(int(gaps.astype(np.int64).max()))) if len(gaps) else None,
+        "first": str(pd.Timestamp(valid.min())) if len(valid) else None,
+        "last": str(pd.Timestamp(valid.max())) if len(valid) else None,
+    }
+
+def profile_feed(df):
+    names = [str(col).strip().lower() for col in df.columns]
+    nulls = df.isna().sum().to_numpy()
+    columns = {}
+    for (name, (_, values)), null_count in zip(zip(names, df.items()), nulls):
+        columns[name] = {
+            "dtype": str(values.dtype),
+            "nulls": int(null_count),
+            "numeric_frac": round(_numeric_fraction(values), 4),
+        }
+    profile = {"rows": int(len(df)), "columns": columns, "time": None}
+    if "time" in names:
+        profile["time"] = _profile_time(df.iloc[:, names.index("time")])
+    return profile
+
+# ✅ Cached profile from load_feed if it still describes df, else a fresh one
+def get_feed_profile(df):
+    profile = df.attrs.get("profile")
+    if profile and profile["rows"] == len(df) and list(profile["columns"]) == [str(c).strip().lower() for c in df.columns]:
+        return profile
+    return profile_feed(df)
+
+# ✅ Per-column profile as a table for display
+def profile_frame(profile):
+    table = pd.DataFrame.from_dict(profile["columns"], orient="index")
+    table.index.name = "column"
+    return table.reset_index()
+
+def validate_feed(df, profile=None):
+    profile = profile or get_feed_profile(df)
+    columns = profile["columns"]
     issues = []
 
     # Check key columns
-    for col in ["m #", "output", "arrival"]:
-        if col not in df.columns:
+    for col in KEY_COLUMNS:
+        if col not in columns:
             issues.append(f"❌ Missing column: {col}")
-        elif df[col].isnull().any():
+        elif columns[col]["nulls"]:
             issues.append(f"⚠️ Nulls found in column '{col}'")
 
     # Check for string-looking numerics
-    sample = df.select_dtypes(include="object").head()
-    for col in sample.columns:
-        if sample[col].apply(lambda x: isinstance(x, str) and x.replace(".", "").isdigit()).any():
+    for col, info in columns.items():
+        if info["dtype"] in ("object", "string", "str") and info["numeric_frac"] > 0:
             issues.append(f"🧪 Column '{col}' may store numbers as strings")
 
+    # Check the time axis
+    time = profile["time"]
+    if time:
+        if time["unparsed"]:
+            issues.append(f"⏱️ {time['unparsed']} timestamps could not be parsed")
+        if not time["monotonic"]:
+            issues.append(f"↕️ Time column is out of order in {time['out_of_order']} places")
+        if time["duplicates"]:
+            issues.append(f"🔁 {time['duplicates']} duplicate timestamps")
+
     return issues
@@ -0,0 +1,190 @@
+import os
+import hashlib
+import pickle
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+from a02_utils import (
+    normalize_feed_times, compile_origin_schema, find_changed_rows, get_special_anchor,
+    build_traveler_columns, build_traveler_report, get_time_index, scope_positions, scope_feed, report_row_hlc,
+    process_feed_report,
+)
+
+# ♻️ Incremental feed processing – only rows appended since the last run are scanned
+#
+# State per feed (pickled under STATE_DIR):
+#   columns      header tuple the state was built from
+#   rows         number of feed rows already processed (watermark position)
+#   watermark    time of the last processed row
+#   prefix_hash  hash of the processed rows, used to detect rewritten history
+#   origins      origin → {"last": newest valid row, "events": changed rows so far}
+#
+# Events are report-time independent (arrival + H/L/C + the previous valid row),
+# so Input, Diff, Day, the scope window and WASP/Macedonia rows are rederived every run.
+# Events pair neighbouring rows, which is only what a scoped scan compares when the feed is in
+# time order; feeds with rows out of order (or without a time) are processed in full instead.
+
+STATE_DIR = ".feed_state"
+EVENT_FIELDS = ["pos", "prev_pos", "time", "prev_time", "hlc"]
+
+def _state_path(state_dir, feed_type, columns):
+    key = hashlib.sha1(repr((feed_type, columns)).encode()).hexdigest()[:16]
+    return os.path.join(state_dir, f"{feed_type}_{key}.pkl")
+
+def load_feed_state(state_dir, feed_type, columns):
+    path = _state_path(state_dir, feed_type, columns)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+    except Exception:
+        return None
+
+def save_feed_state(state, state_dir, feed_type):
+    os.makedirs(state_dir, exist_ok=True)
+    path = _state_path(state_dir, feed_type, state["columns"])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def _prefix_hash(df, rows):
+    hashed = hash_pandas_object(df.iloc[:rows], index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+def empty_change_events():
+    return {"pos": np.empty(0, dtype=np.int64), "prev_pos": np.empty(0, dtype=np.int64),
+            "time": np.empty(0, dtype="datetime64[ns]"), "prev_time": np.empty(0, dtype="datetime64[ns]"),
+            "hlc": np.empty((0, 3), dtype=np.float64)}
+
+def new_event_state(columns):
+    return {"columns": columns, "rows": 0, "watermark": None, "prefix_hash": None, "origins": {}}
+
+# ✅ Is the stored state still a valid prefix of this feed?
+def _state_matches(state, df, columns):
+    if state is None or state["columns"] != columns or len(df) < state["rows"]:
+        return False
+    new_times = df["time"].to_numpy()[state["rows"]:]
+    if state["watermark"] is not None and len(new_times) and (new_times < state["watermark"]).any():
+        return False
+    return _prefix_hash(df, state["rows"]) == state["prefix_hash"]
+
+# ✅ Scan rows [start, len(df)) in chronological order and extend each origin's events
+def advance_change_events(state, df, schema, start):
+    times = df["time"].to_numpy().astype("datetime64[ns]")
+    row_valid = pd.notna(times) & df["open"].notna().to_numpy()
+    positions = np.arange(len(df))
+    for origin, spec in schema.origins.items():
+        entry = state["origins"].setdefault(origin, {"last": None, "events": empty_change_events()})
+        block = df.iloc[start:, list(spec.positions)].to_numpy()
+        valid = row_valid[start:] & pd.notna(block).all(axis=1)
+        block, pos, tms = block[valid], positions[start:][valid], times[start:][valid]
+        if not len(pos):
+            continue
+        if entry["last"] is not None:
+            last_pos, last_time, last_hlc = entry["last"]
+            block = np.vstack([np.asarray(last_hlc, dtype=block.dtype)[None, :], block])
+            pos = np.concatenate([[last_pos], pos])
+            tms = np.concatenate([np.asarray([last_time], dtype="datetime64[ns]"), tms])
+        # find_changed_rows expects newest first; row i is compared with the older row i+1
+        changed = find_changed_rows(block[::-1])
+        newer = len(pos) - 1 - changed
+        older = newer - 1
+        new_events = {
+            "pos": pos[newer], "prev_pos": pos[older],
+            "time": tms[newer], "prev_time": tms[older],
+            "hlc": block[newer].astype(np.float64),
+        }
+        events = entry["events"]
+        entry["events"] = {
+            key: np.concatenate([events[key], new_events[key][::-1]]) for key in EVENT_FIELDS
+        }
+        entry["last"] = (pos[-1], tms[-1], block[-1].copy())
+    state["rows"] = len(df)
+    state["watermark"] = pd.Series(times).max() if len(df) else None
+    state["prefix_hash"] = _prefix_hash(df, len(df))
+    return state
+
+# ✅ Which events fall inside the scope window (same rows process_feed_report would keep)
+def scope_event_mask(events, df, report_time, scope_type, scope_value):
+    keep = np.ones(len(events["pos"]), dtype=bool)
+    if not report_time:
+        return keep
+    if scope_type == "Rows":
+        window = scope_positions(df, get_time_index(df), report_time, scope_type, scope_value)
+        if window is None:
+            return keep
+        if not len(window):
+            return ~keep
+        lo, hi = window[0], window[-1]
+        # Oldest row in the window has no row below it, so it can never be "changed"
+        return (events["pos"] <= hi) & (events["pos"] >= lo) & (events["prev_pos"] >= lo)
+    cutoff = np.datetime64(report_time - pd.Timedelta(days=scope_value), "ns")
+    return (events["time"] >= cutoff) & (events["prev_time"] >= cutoff)
+
+# ✅ Incremental counterpart of process_feed_report (same signature + state_dir)
+def process_feed_incremental(df, feed_type, report_time, scope_type, scope_value, start_hour,
+                             measurements, input_value, state_dir=STATE_DIR):
+    df.columns = df.columns.str.strip().str.lower()
+    normalize_feed_times(df)
+    if report_time and not get_time_index(df).ordered:
+        return process_feed_report(df, feed_type, report_time, scope_type, scope_value, start_hour,
+                                   measurements, input_value)
+    columns = tuple(df.columns)
+    schema = compile_origin_schema(columns)
+
+    state = load_feed_state(state_dir, feed_type, columns)
+    if _state_matches(state, df, columns):
+        start = state["rows"]
+    else:
+        # 🔁 New feed, new header or rewritten history → full rebuild
+        state = new_event_state(columns)
+        start = 0
+    if start < len(df) or state["prefix_hash"] is None:
+        advance_change_events(state, df, schema, start)
+        save_feed_state(state, state_dir, feed_type)
+
+    return build_report_from_events(df, state, schema, feed_type, report_time, scope_type, scope_value,
+                                    start_hour, measurements, input_value)
+
+# ✅ Expand stored change events into a traveler report for one report_time
+# pivots: optional origin → precomputed (events × measurements) Output matrix
+# max_time: drop events after this time (feed restricted to report time or earlier)
+# df must be in time order (get_time_index(df).ordered), or a prefix of a feed that is
+def build_report_from_events(df, state, schema, feed_type, report_time, scope_type, scope_value, start_hour,
+                             measurements, input_value, pivots=None, max_time=None):
+    scoped, report_at = scope_feed(df, report_time, scope_type, scope_value)
+
+    column_chunks = []
+    for origin, spec in schema.origins.items():
+        outputs = None
+        if spec.kind:
+            # WASP / Macedonia rows depend on report_time: read the report row directly
+            if report_time is None:
+                continue
+            hlc = report_row_hlc(scoped, report_at, spec)
+            if hlc is None:
+                continue
+            arrival_time = get_special_anchor(spec.kind, spec.bracket, pd.Timestamp(report_time), start_hour)
+            arrivals = [arrival_time]
+        else:
+            events = state["origins"].get(origin, {"events": empty_change_events()})["events"]
+            mask = scope_event_mask(events, df, report_time, scope_type, scope_value)
+            if max_time is not None:
+                mask &= events["time"] <= np.datetime64(max_time, "ns")
+            keep = np.flatnonzero(mask)[::-1]
+            if not len(keep):
+                continue
+            hlc, arrivals = events["hlc"][keep], events["time"][keep]
+            if pivots is not None and origin in pivots:
+                outputs = pivots[origin][keep]
+
+        column_chunks.append(build_traveler_columns(
+            feed_type, origin, arrivals, hlc[:, 0], hlc[:, 1], hlc[:, 2],
+            measurements, input_value, report_time, start_hour, outputs=outputs
+        ))
+
+    report = build_traveler_report(column_chunks)
+    report.attrs["malformed_origins"] = dict(schema.malformed)
+    return report
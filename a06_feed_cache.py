@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from a02_utils import upload_bytes
+from a04_feed_sanitizer_01 import profile_feed
+from a14_schemas import read_feed_csv
+
+# 🗄️ Parsed-feed cache – sanitized feeds stored as Parquet, keyed by upload content hash
+#
+# Parquet (pyarrow ships with streamlit) keeps dtypes, so a cache hit skips the typed
+# CSV parse (read_feed_csv) and timestamp parsing. The feed's schema profile sits next to it as
+# <hash>.profile.json, so validation is free on a hit too. Files are evicted
+# least-recently-used first once the directory grows past MAX_CACHE_BYTES.
+
+CACHE_DIR = ".feed_cache"
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+CACHE_VERSION = "3"  # bump when read_feed_csv output changes
+
+def content_hash(data):
+    return hashlib.sha1(CACHE_VERSION.encode() + data).hexdigest()
+
+# ✅ Cache key of an upload without parsing it (same key load_feed stores under)
+def feed_key(source):
+    return content_hash(upload_bytes(source))
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+def _profile_path(parquet_path):
+    return parquet_path[:-len(".parquet")] + ".profile.json"
+
+def _save_profile(parquet_path, profile):
+    try:
+        tmp = _profile_path(parquet_path) + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(profile, fh)
+        os.replace(tmp, _profile_path(parquet_path))
+    except Exception:
+        pass
+
+def _load_profile(parquet_path, df):
+    try:
+        with open(_profile_path(parquet_path)) as fh:
+            return json.load(fh)
+    except Exception:
+        profile = profile_feed(df)  # older cache entry without a profile
+        _save_profile(parquet_path, profile)
+        return profile
+
+# ✅ Drop least-recently-used files until the cache fits the size cap
+def evict_cache(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".parquet"):
+            path = os.path.join(cache_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        if os.path.exists(_profile_path(path)):
+            os.remove(_profile_path(path))
+        total -= size
+
+# ✅ Load a feed upload: cache hit → Parquet read, miss → typed parse + store
+def load_feed(source, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, parse=read_feed_csv):
+    data = upload_bytes(source)
+    key = content_hash(data)
+    path = _cache_path(cache_dir, key)
+
+    if os.path.exists(path):
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # mark as recently used
+            df.attrs["time_parsed"] = "time" in df.columns
+            df.attrs["content_hash"] = key
+            df.attrs["profile"] = _load_profile(path, df)
+            return df
+        except Exception:
+            os.remove(path)
+
+    df = parse(data)
+    profile = profile_feed(df)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        _save_profile(path, profile)
+        evict_cache(cache_dir, max_bytes)
+    except Exception:
+        pass  # caching is best-effort; the parsed feed is still returned
+    df.attrs["content_hash"] = key
+    df.attrs["profile"] = profile
+    return df
@@ -0,0 +1,85 @@
+import os
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from a02_utils import (
+    normalize_feed_times, compile_origin_schema, scope_feed, scope_key,
+    process_feed_report, concat_traveler_reports,
+)
+
+# 🧵 Parallel feed processing – (feed, origin group) shards on a persistent process pool
+#
+# The pool is module-level, so it survives Streamlit reruns (the module stays imported)
+# and workers are only spawned once. Shards are merged in feed order, then origin order,
+# which is the same row order the sequential process_feed_report calls produce.
+
+_POOL = None
+_POOL_WORKERS = None
+
+def get_worker_pool(max_workers=None):
+    global _POOL, _POOL_WORKERS
+    max_workers = max_workers or os.cpu_count() or 1
+    if _POOL is None or _POOL_WORKERS != max_workers:
+        shutdown_worker_pool()
+        # spawn: forking a threaded Streamlit server can deadlock the children
+        _POOL = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        _POOL_WORKERS = max_workers
+    return _POOL
+
+def shutdown_worker_pool():
+    global _POOL, _POOL_WORKERS
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+    _POOL, _POOL_WORKERS = None, None
+
+atexit.register(shutdown_worker_pool)
+
+# ✅ Worker: run the normal processor on one pre-scoped column shard
+def _process_shard(shard, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value):
+    shard.attrs["scope"] = scope_key(report_time, scope_type, scope_value)
+    shard.attrs["time_parsed"] = True
+    return process_feed_report(shard, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value)
+
+# ✅ Split one feed into contiguous origin groups: ["time", "open"] + each group's H/L/C columns
+def shard_feed(df, report_time, scope_type, scope_value, n_shards):
+    df.columns = df.columns.str.strip().str.lower()
+    normalize_feed_times(df)
+    scoped, _ = scope_feed(df, report_time, scope_type, scope_value)
+    schema = compile_origin_schema(tuple(df.columns))
+    specs = list(schema.origins.values())
+    n_shards = max(1, min(n_shards, len(specs)))
+    base = [df.columns.get_loc("time"), df.columns.get_loc("open")]
+    shards = []
+    for k in range(n_shards):
+        group = specs[k * len(specs) // n_shards:(k + 1) * len(specs) // n_shards]
+        positions = sorted(set(base + [pos for spec in group for pos in spec.positions]))
+        shards.append(scoped.iloc[:, positions])
+    return shards, schema
+
+# ✅ Process several feeds at once, e.g. [(small_df, "Sm"), (big_df, "Bg")]
+def process_feeds_parallel(feeds, report_time, scope_type, scope_value, start_hour, measurements, input_value,
+                           max_workers=None):
+    pool = get_worker_pool(max_workers)
+    n_workers = _POOL_WORKERS
+    jobs = []
+    for df, feed_type in feeds:
+        shards, schema = shard_feed(df, report_time, scope_type, scope_value, n_workers)
+        jobs.append((feed_type, shards, schema))
+
+    try:
+        futures = [
+            [pool.submit(_process_shard, shard, feed_type, report_time, scope_type, scope_value,
+                         start_hour, measurements, input_value) for shard in shards]
+            for feed_type, shards, _ in jobs
+        ]
+        reports = [future.result() for feed_futures in futures for future in feed_futures]
+    except BrokenProcessPool:
+        shutdown_worker_pool()
+        raise
+
+    final = concat_traveler_reports(reports)
+    final.attrs["malformed_origins"] = {
+        feed_type: dict(schema.malformed) for feed_type, _, schema in jobs if schema.malformed
+    }
+    return final
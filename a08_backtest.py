@@ -0,0 +1,74 @@
+import os
+from a02_utils import (
+    normalize_timestamp, normalize_feed_times, compile_origin_schema, calculate_pivot_matrix,
+    get_input_value, concat_traveler_reports, get_time_index, process_feed_report,
+)
+from a05_incremental import new_event_state, advance_change_events, build_report_from_events
+
+# 🔁 Batch / backtest mode – one traveler report per report time
+#
+# Change detection and the (changed rows × measurements) pivots do not depend on
+# report_time, so they run once per feed. Each report time then only re-derives the
+# scope window, Input, Diff, Day and the WASP/Macedonia report rows. A feed with rows out of
+# time order (or without a time) is scanned per report time instead: its scope windows and
+# "up to report time" views are not blocks of neighbouring rows, so the events do not apply.
+
+# ✅ Report-time independent part of one feed: change events + pivot matrix per origin
+def prepare_feed(df, feed_type, measurements):
+    df.columns = df.columns.str.strip().str.lower()
+    normalize_feed_times(df)
+    schema = compile_origin_schema(tuple(df.columns))
+    state = advance_change_events(new_event_state(tuple(df.columns)), df, schema, 0)
+    m_values = measurements["m value"].to_numpy()
+    pivots = {}
+    for origin, entry in state["origins"].items():
+        hlc = entry["events"]["hlc"]
+        pivots[origin] = calculate_pivot_matrix(hlc[:, 0], hlc[:, 1], hlc[:, 2], m_values)
+    return {"df": df, "feed_type": feed_type, "schema": schema, "state": state, "pivots": pivots,
+            "ordered": get_time_index(df).ordered}
+
+def report_filename(report_time):
+    return f"origin_report_{report_time.strftime('%y-%m-%d_%H-%M')}.csv"
+
+# ✅ Run every report time against the prepared feeds
+# feeds: [(small_df, "Sm"), (big_df, "Bg")]; Input comes from the first feed with a row at report_time.
+# Returns ({report_time: report}, skipped) – report times without an Input value are skipped.
+def process_feeds_batch(feeds, report_times, scope_type, scope_value, start_hour, measurements,
+                        filter_future_data=True, output_dir=None):
+    prepared = [prepare_feed(df, feed_type, measurements) for df, feed_type in feeds]
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    reports, skipped = {}, []
+    for report_time in report_times:
+        report_time = normalize_timestamp(report_time)
+        views = []
+        for feed in prepared:
+            df = feed["df"]
+            views.append(df[df["time"] <= report_time] if filter_future_data else df)
+
+        input_value = None
+        for view in views:
+            input_value = get_input_value(view, report_time)
+            if input_value is not None:
+                break
+        if input_value is None:
+            skipped.append(report_time)
+            continue
+
+        report = concat_traveler_reports([
+            build_report_from_events(
+                view, feed["state"], feed["schema"], feed["feed_type"], report_time, scope_type, scope_value,
+                start_hour, measurements, input_value, pivots=feed["pivots"],
+                max_time=report_time if filter_future_data else None,
+            ) if feed["ordered"] else process_feed_report(
+                view, feed["feed_type"], report_time, scope_type, scope_value, start_hour, measurements, input_value,
+            )
+            for view, feed in zip(views, prepared)
+        ])
+        report.sort_values(by=["Output", "Arrival"], ascending=[False, True], inplace=True)
+        if output_dir:
+            report.to_csv(os.path.join(output_dir, report_filename(report_time)), index=False)
+        reports[report_time] = report
+
+    return reports, skipped
@@ -0,0 +1,61 @@
+import io
+import hashlib
+from collections import OrderedDict
+import pandas as pd
+from a02_utils import upload_bytes
+from a14_schemas import MEASUREMENT_SCHEMA, apply_schema
+
+# 📐 Measurement store – every sheet of a workbook parsed once, cached by workbook hash
+#
+# xlsx files are streamed with openpyxl in read-only mode; each sheet becomes a compact
+# frame (float64 m value, numeric m # / r #, categorical tag / family). Switching tabs
+# is then a dict lookup instead of another pd.read_excel pass.
+
+MAX_WORKBOOKS = 8
+_STORE = OrderedDict()
+
+# ✅ Normalize headers and shrink one sheet to typed columns
+def compact_sheet(df):
+    df = df.copy()
+    df.columns = [str(col).strip().lower() for col in df.columns]
+    return apply_schema(df, MEASUREMENT_SCHEMA)
+
+def _read_xlsx_sheets(data):
+    from openpyxl import load_workbook
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    sheets = {}
+    try:
+        for ws in workbook.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                sheets[ws.title] = pd.DataFrame()
+                continue
+            body = [row for row in rows if any(value is not None for value in row)]
+            sheets[ws.title] = pd.DataFrame(body, columns=[h if h is not None else "" for h in header])
+    finally:
+        workbook.close()
+    return sheets
+
+# ✅ Parse (or fetch from cache) every sheet of a measurement workbook
+def load_measurement_store(source):
+    data = upload_bytes(source)
+    key = hashlib.sha1(data).hexdigest()
+    if key in _STORE:
+        _STORE.move_to_end(key)
+        return _STORE[key]
+
+    try:
+        raw = _read_xlsx_sheets(data)
+    except Exception:
+        raw = pd.read_excel(io.BytesIO(data), sheet_name=None)  # .xls or unusual workbooks
+    store = {"hash": key, "sheet_names": list(raw), "sheets": {name: compact_sheet(df) for name, df in raw.items()}}
+
+    _STORE[key] = store
+    while len(_STORE) > MAX_WORKBOOKS:
+        _STORE.popitem(last=False)
+    return store
+
+def default_sheet(store, preferred="2a"):
+    names = store["sheet_names"]
+    return preferred if preferred in names else names[0]
@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from a02_utils import normalize_timestamp, read_feed_scoped, get_input_value, process_feed_report, concat_traveler_reports
+from a06_feed_cache import load_feed
+from a08_backtest import process_feeds_batch, report_filename
+from a09_measurement_store import load_measurement_store, default_sheet
+from a15_sequences import sequence_rows
+import a003_models_01cp
+import a003_models_06cg
+
+# 🖥️ Headless runner – traveler reports + A/B/C model detection without a browser
+#
+#   python a10_cli.py --small small.csv --big big.csv --measurements meas.xlsx \
+#       --report-time "2025-03-10 18:00" --report-time "2025-03-11 18:00" \
+#       --scope-type Days --scope-value 10 --detect --out runs/
+#
+# --detector picks the model set: "01cp" (default) runs the A and B models the app
+# (a01_main08_cp) shows; "06cg" runs a003_models_06cg – A models, B pairs and C models,
+# but not the B01/B02 three-traveler descenders.
+#
+# --stream reads only the scope window of each feed (read_feed_scoped) instead of loading
+# whole files; it takes exactly one --report-time and is meant for multi-year archives.
+
+# Detector functions per --detector; each returns (model code → hits, report time)
+DETECTORS = {
+    "01cp": [a003_models_01cp.detect_A_models, a003_models_01cp.detect_B_models],
+    "06cg": [a003_models_06cg.detect_A_models],
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate traveler reports and model detections from feed CSVs.")
+    parser.add_argument("--small", required=True, help="small feed CSV")
+    parser.add_argument("--big", required=True, help="big feed CSV")
+    parser.add_argument("--measurements", required=True, help="measurement workbook (.xlsx / .xls)")
+    parser.add_argument("--sheet", default=None, help="measurement tab (default: 2a, else first sheet)")
+    parser.add_argument("--report-time", action="append", default=[],
+                        help="report time, repeatable (default: most recent time in the feeds)")
+    parser.add_argument("--scope-type", choices=["Rows", "Days"], default="Rows")
+    parser.add_argument("--scope-value", type=int, default=10)
+    parser.add_argument("--start-hour", type=int, choices=[17, 18], default=18, help="day start hour")
+    parser.add_argument("--include-future", action="store_true", help="keep rows after the report time")
+    parser.add_argument("--detect", action="store_true", help="run model detection on each report")
+    parser.add_argument("--detector", choices=sorted(DETECTORS), default="01cp",
+                        help="model set: 01cp = the app's A + B models (default), 06cg = A, B pairs and C models")
+    parser.add_argument("--stream", action="store_true",
+                        help="read only the scope window of each feed (one --report-time; Rows scope needs --include-future)")
+    parser.add_argument("--out", default="reports", help="output directory")
+    return parser.parse_args(argv)
+
+def log_timing(stage, started, rows=None):
+    elapsed = time.perf_counter() - started
+    suffix = f" ({rows:,} rows)" if rows is not None else ""
+    print(f"⏱️ {stage}: {elapsed:.2f}s{suffix}", file=sys.stderr)
+
+# ✅ Flatten detector output into one row per hit
+def detections_frame(model_outputs, report):
+    rows = []
+    for code, results in model_outputs.items():
+        for res in results:
+            seq = sequence_rows(report, res)
+            rows.append({
+                "Model": code,
+                "Label": res["label"],
+                "Output": res["output"],
+                "Timestamp": res["timestamp"],
+                "Feeds": res["feeds"],
+                "M Path": " → ".join(f"|{m}|" for m in seq["M #"].tolist()),
+                "Origins": ", ".join(str(o) for o in seq["Origin"].tolist()),
+            })
+    return pd.DataFrame(rows, columns=["Model", "Label", "Output", "Timestamp", "Feeds", "M Path", "Origins"])
+
+# ✅ One report from feeds read window-first; the result is marked scoped, so it is not trimmed again
+# Rows scope counts positions over the whole file, so it cannot be combined with the future-data filter.
+def stream_report(args, report_time, measurements):
+    feeds = []
+    for path, feed_type in [(args.small, "Sm"), (args.big, "Bg")]:
+        df = read_feed_scoped(path, report_time, args.scope_type, args.scope_value)
+        if not args.include_future:
+            df = df[df["time"] <= report_time]
+        feeds.append((df, feed_type))
+
+    input_value = None
+    for df, _ in feeds:
+        input_value = get_input_value(df, report_time)
+        if input_value is None:
+            input_value = df.attrs.get("report_open")
+        if input_value is not None:
+            break
+    if input_value is None:
+        return {}, [report_time]
+    report = concat_traveler_reports([
+        process_feed_report(df, feed_type, report_time, args.scope_type, args.scope_value, args.start_hour,
+                            measurements, input_value)
+        for df, feed_type in feeds
+    ])
+    report.sort_values(by=["Output", "Arrival"], ascending=[False, True], inplace=True)
+    report.to_csv(os.path.join(args.out, report_filename(report_time)), index=False)
+    return {report_time: report}, []
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stream and len(args.report_time) != 1:
+        print("❌ --stream needs exactly one --report-time", file=sys.stderr)
+        return 2
+    if args.stream and args.scope_type == "Rows" and not args.include_future:
+        print("❌ --stream with Rows scope needs --include-future", file=sys.stderr)
+        return 2
+    os.makedirs(args.out, exist_ok=True)
+
+    if not args.stream:
+        started = time.perf_counter()
+        small_df = load_feed(args.small)
+        big_df = load_feed(args.big)
+        log_timing("load + sanitize feeds", started, len(small_df) + len(big_df))
+
+    started = time.perf_counter()
+    store = load_measurement_store(args.measurements)
+    sheet = args.sheet or default_sheet(store)
+    if sheet not in store["sheets"]:
+        print(f"❌ Unknown measurement tab '{sheet}' (have: {', '.join(store['sheet_names'])})", file=sys.stderr)
+        return 2
+    measurements = store["sheets"][sheet]
+    log_timing(f"measurements [{sheet}]", started, len(measurements))
+
+    if args.report_time:
+        report_times = [normalize_timestamp(pd.Timestamp(value)) for value in args.report_time]
+    else:
+        report_times = [normalize_timestamp(max(small_df["time"].max(), big_df["time"].max()))]
+
+    started = time.perf_counter()
+    if args.stream:
+        reports, skipped = stream_report(args, report_times[0], measurements)
+    else:
+        reports, skipped = process_feeds_batch(
+            [(small_df, "Sm"), (big_df, "Bg")], report_times, args.scope_type, args.scope_value,
+            args.start_hour, measurements, filter_future_data=not args.include_future, output_dir=args.out,
+        )
+    log_timing(f"traveler reports x{len(reports)}", started, sum(len(r) for r in reports.values()))
+    for report_time in skipped:
+        print(f"⚠️ No input value at {report_time:%Y-%m-%d %H:%M}, skipped", file=sys.stderr)
+
+    if args.detect:
+        for report_time, report in reports.items():
+            started = time.perf_counter()
+            model_outputs = {}
+            for detect in DETECTORS[args.detector]:
+                model_outputs.update(detect(report)[0])
+            detections = detections_frame(model_outputs, report)
+            name = report_filename(report_time).replace("origin_report_", "detections_")
+            detections.to_csv(os.path.join(args.out, name), index=False)
+            log_timing(f"detection {report_time:%Y-%m-%d %H:%M}", started, len(detections))
+
+    return 0 if reports else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime as dt
+import tempfile
+import tracemalloc
+import subprocess
+import numpy as np
+import pandas as pd
+from a02_utils import (
+    compile_origin_schema, newest_first, origin_changes, calculate_pivot_matrix, build_traveler_columns,
+    build_traveler_report, scope_feed, process_feed_report, process_feed, REPORT_COLUMNS,
+    get_input_value, normalize_feed_times, CATEGORY_COLUMNS, clean_timestamp, extract_origins, calculate_pivot,
+    get_day_index, get_weekly_anchor, get_monthly_anchor,
+)
+from a05_incremental import process_feed_incremental
+from a08_backtest import process_feeds_batch
+from a04_feed_sanitizer_01 import profile_feed
+from a14_schemas import read_feed_csv
+
+# 📏 Scaling benchmark for process_feed – synthetic feeds, per-stage time / throughput / peak memory
+#
+#   python a11_benchmark.py                         # default size grid
+#   python a11_benchmark.py --rows 20000 100000 --origins 20 60 --measurements 80
+#   python a11_benchmark.py --compare bench_results/<earlier run>.json
+#   python a11_benchmark.py --check 60              # randomized parity checks (original loop, event reports)
+#
+# Results go to bench_results/<label>_<timestamp>.json (label defaults to the git revision).
+
+RESULTS_DIR = "bench_results"
+ORIGIN_NAMES = ["Saturn", "Jupiter", "Spain", "Trinidad", "Tobago", "Kepler-62f", "Kepler-442b", "Mars", "Venus", "Mercury"]
+
+# ✅ Synthetic feed: hourly rows, tz-suffixed timestamps, H/L/C origins that hold for a while then change
+def make_synthetic_feed(n_rows, n_origins=20, n_wasp=2, n_macedonia=2, change_prob=0.2, missing_prob=0.02,
+                        start=dt.datetime(2024, 1, 1, 18), seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=n_rows, freq="h")
+    data = {
+        "time": times.strftime("%Y-%m-%dT%H:%M:%S") + "-05:00",
+        "open": np.round(4000 + rng.normal(0, 30, n_rows).cumsum() * 0.1, 2),
+    }
+
+    def hlc_block():
+        base = 4000 + rng.normal(0, 50, n_rows)
+        # Carry the previous row forward unless this row is a "change"
+        changed = rng.random(n_rows) < change_prob
+        changed[0] = True
+        base = base[np.maximum.accumulate(np.where(changed, np.arange(n_rows), 0))]
+        spread = np.abs(rng.normal(20, 5, n_rows))[np.maximum.accumulate(np.where(changed, np.arange(n_rows), 0))]
+        block = np.round(np.column_stack([base + spread, base - spread, base + spread * 0.2]), 2)
+        block[rng.random(n_rows) < missing_prob, 0] = np.nan
+        return block
+
+    for k in range(n_origins):
+        name = ORIGIN_NAMES[k % len(ORIGIN_NAMES)] + (f"-{k // len(ORIGIN_NAMES)}" if k >= len(ORIGIN_NAMES) else "")
+        block = hlc_block()
+        for j, suffix in enumerate(["H", "L", "C"]):
+            data[f"{name} {suffix}"] = block[:, j]
+    for kind, count in [("WASP-12b", n_wasp), ("Macedonia", n_macedonia)]:
+        for bracket in range(1, count + 1):
+            block = hlc_block()
+            for j, suffix in enumerate(["H", "L", "C"]):
+                data[f"{kind} {suffix} [{bracket}]"] = block[:, j]
+    return pd.DataFrame(data)
+
+def make_synthetic_measurements(n_measurements=80, seed=1):
+    rng = np.random.default_rng(seed)
+    m_numbers = rng.integers(-60, 61, n_measurements)
+    return pd.DataFrame({
+        "m name": [f"M{int(m)}" for m in m_numbers],
+        "m value": np.round(m_numbers / 40.0, 3),
+        "m #": m_numbers,
+        "r #": rng.integers(0, 12, n_measurements),
+        "tag": rng.choice(["Tag A", "Tag B", "Tag C"], n_measurements),
+        "family": rng.choice(["F1", "F2"], n_measurements),
+    })
+
+def _measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+# ✅ Time each stage of the pipeline on one synthetic configuration
+def run_case(n_rows, n_origins, n_measurements, change_prob=0.2, scope_days=None, seed=0):
+    feed = make_synthetic_feed(n_rows, n_origins=n_origins, change_prob=change_prob, seed=seed)
+    measurements = make_synthetic_measurements(n_measurements, seed=seed + 1)
+    csv_bytes = feed.to_csv(index=False).encode()
+    report_time = pd.Timestamp(feed["time"].iloc[-1][:19])
+    scope_days = scope_days or n_rows  # default: whole feed in scope
+    stages = {}
+
+    df, stages["parse"], peak = _measure(lambda: read_feed_csv(csv_bytes))
+    stages_peak = {"parse": peak}
+    _, stages["profile"], stages_peak["profile"] = _measure(lambda: profile_feed(df))
+
+    scoped, _ = scope_feed(df, report_time, "Days", scope_days)
+    reversed_df, times, row_valid = newest_first(scoped)
+    schema = compile_origin_schema(tuple(df.columns))
+    plain = [spec for spec in schema.origins.values() if not spec.kind]
+
+    def detect():
+        return [(spec.name, *origin_changes(reversed_df, times, row_valid, spec)) for spec in plain]
+    changes, stages["change_detection"], stages_peak["change_detection"] = _measure(detect)
+
+    m_values = measurements["m value"].to_numpy()
+    pivots, stages["pivots"], stages_peak["pivots"] = _measure(
+        lambda: [calculate_pivot_matrix(hlc[:, 0], hlc[:, 1], hlc[:, 2], m_values) for _, _, hlc in changes]
+    )
+
+    def build():
+        chunks = [
+            build_traveler_columns("Bg", name, arrivals, hlc[:, 0], hlc[:, 1], hlc[:, 2], measurements, 4000.0,
+                                   report_time, 18, outputs=outputs)
+            for (name, arrivals, hlc), outputs in zip(changes, pivots) if len(arrivals)
+        ]
+        return build_traveler_report(chunks)
+    report, stages["report_build"], stages_peak["report_build"] = _measure(build)
+
+    _, end_to_end, end_to_end_peak = _measure(lambda: process_feed_report(
+        df.copy(), "Bg", report_time, "Days", scope_days, 18, measurements, 4000.0))
+
+    return {
+        "rows": n_rows, "origins": n_origins, "measurements": n_measurements, "change_prob": change_prob,
+        "changed_rows": int(sum(len(arrivals) for _, arrivals, _ in changes)),
+        "travelers": int(len(report)),
+        "seconds": {k: round(v, 5) for k, v in stages.items()},
+        "peak_mb": {k: round(v / 2**20, 2) for k, v in stages_peak.items()},
+        "rows_per_second": {k: round(n_rows / v) if v else None for k, v in stages.items()},
+        "process_feed_report": {"seconds": round(end_to_end, 5), "peak_mb": round(end_to_end_peak / 2**20, 2),
+                                "travelers_per_second": round(len(report) / end_to_end) if end_to_end else None},
+    }
+
+def _records_frame(records):
+    return pd.DataFrame(records, columns=REPORT_COLUMNS)
+
+# ✅ Reference: the original per-row iloc loop process_feed replaced (parity check only)
+def process_feed_reference(df, feed_type, report_time, scope_type, scope_value, start_hour, measurements, input_value):
+    df.columns = df.columns.str.strip().str.lower()
+    df["time"] = df["time"].apply(clean_timestamp)
+    df = df.iloc[::-1]  # reverse chronological
+
+    if report_time:
+        if scope_type == "Rows":
+            try:
+                start_index = df[df["time"] == report_time].index[0]
+                df = df.iloc[start_index:start_index + scope_value]
+            except:
+                pass
+        else:
+            cutoff = report_time - pd.Timedelta(days=scope_value)
+            df = df[df["time"] >= cutoff]
+
+    origins = extract_origins(df.columns)
+    new_data_rows = []
+
+    for origin, cols in origins.items():
+        relevant_rows = df[["time", "open"] + cols].dropna()
+        origin_name = origin.lower()
+        is_special = any(tag in origin_name for tag in ["wasp", "macedonia"])
+
+        if is_special:
+            report_row = relevant_rows[relevant_rows["time"] == report_time]
+            if report_row.empty:
+                continue
+            current = report_row.iloc[0]
+            bracket_number = 0
+            if "[" in origin_name and "]" in origin_name:
+                try:
+                    bracket_number = int(origin_name.split("[")[-1].replace("]", ""))
+                except:
+                    pass
+            if "wasp" in origin_name:
+                arrival_time = get_weekly_anchor(report_time, max(1, bracket_number), start_hour)
+            elif "macedonia" in origin_name:
+                arrival_time = get_monthly_anchor(report_time, max(1, bracket_number), start_hour)
+            else:
+                arrival_time = report_time
+            H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
+            for _, row in measurements.iterrows():
+                output = calculate_pivot(H, L, C, row["m value"])
+                day = get_day_index(arrival_time, report_time, start_hour)
+                new_data_rows.append({
+                    "Feed": feed_type, "Arrival": arrival_time, "Origin": origin, "M Name": row["m name"],
+                    "M #": row["m #"], "R #": row["r #"], "Tag": row["tag"], "Family": row["family"],
+                    "Input": input_value, "Output": output, "Diff": output - input_value, "Day": day
+                })
+            continue
+
+        for i in range(len(relevant_rows) - 1):
+            current = relevant_rows.iloc[i]
+            above = relevant_rows.iloc[i + 1]
+            changed = any(current[col] != above[col] for col in cols)
+            if changed:
+                arrival_time = current["time"]
+                H, L, C = current[cols[0]], current[cols[1]], current[cols[2]]
+                for _, row in measurements.iterrows():
+                    output = calculate_pivot(H, L, C, row["m value"])
+                    day = get_day_index(arrival_time, report_time, start_hour)
+                    new_data_rows.append({
+                        "Feed": feed_type, "Arrival": arrival_time, "Origin": origin, "M Name": row["m name"],
+                        "M #": row["m #"], "R #": row["r #"], "Tag": row["tag"], "Family": row["family"],
+                        "Input": input_value, "Output": output, "Diff": output - input_value, "Day": day
+                    })
+    for row in new_data_rows:
+        row["Output"] = float(row["Output"])
+        row["M #"] = float(row["M #"])
+        row["Input"] = float(row["Input"])
+        row["Arrival"] = pd.to_datetime(row["Arrival"], errors="coerce")
+
+    return new_data_rows
+
+# ✅ Randomized parity check: process_feed vs the original iloc loop (Rows / Days scope, WASP / Macedonia,
+#    a junk time cell)
+def check_process_feed(trials=60, seed=0):
+    rng = np.random.default_rng(seed)
+    for trial in range(trials):
+        n_rows = int(rng.integers(20, 300))
+        case = {
+            "n_rows": n_rows, "n_origins": int(rng.integers(1, 6)), "n_wasp": int(rng.integers(0, 3)),
+            "n_macedonia": int(rng.integers(0, 3)), "change_prob": float(rng.uniform(0.05, 0.6)),
+            "seed": int(rng.integers(1 << 31)), "n_measurements": int(rng.integers(1, 10)),
+            "scope_type": "Rows" if trial % 2 else "Days", "start_hour": int(rng.choice([17, 18])),
+        }
+        case["scope_value"] = int(rng.integers(1, n_rows + 5 if case["scope_type"] == "Rows" else n_rows // 24 + 3))
+        feed = make_synthetic_feed(n_rows, n_origins=case["n_origins"], n_wasp=case["n_wasp"],
+                                   n_macedonia=case["n_macedonia"], change_prob=case["change_prob"], seed=case["seed"])
+        measurements = make_synthetic_measurements(case["n_measurements"], seed=case["seed"] + 1)
+        report_row = int(rng.integers(n_rows))
+        report_time = pd.Timestamp(feed["time"].iloc[report_row][:19])
+        args = ("Sm", report_time, case["scope_type"], case["scope_value"], case["start_hour"], measurements, 4000.0)
+
+        # A junk time cell is NaT after parsing, as the old sanitize_feed's to_datetime(errors="coerce") made it
+        reference_feed = feed.copy()
+        if trial % 3 == 0 and n_rows > 1:
+            case["garbage_row"] = int((report_row + rng.integers(1, n_rows)) % n_rows)
+            feed.loc[case["garbage_row"], "time"] = "garbage"
+            reference_feed.loc[case["garbage_row"], "time"] = None
+
+        expected = _records_frame(process_feed_reference(reference_feed, *args))
+        actual = _records_frame(process_feed(feed.copy(), *args))
+        try:
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        except AssertionError:
+            return dict(case, report_time=str(report_time))
+    return None
+
+def _sorted_report(report):
+    report = report.astype({col: str for col in CATEGORY_COLUMNS + ["M Name"]})
+    return report.sort_values(REPORT_COLUMNS).reset_index(drop=True)
+
+# ✅ Randomized equivalence check: incremental and batch reports (built from stored change events)
+#    vs process_feed_report, on feeds in time order and with some rows moved out of order
+def check_event_reports(trials=60, seed=0):
+    rng = np.random.default_rng(seed)
+    for trial in range(trials):
+        n_rows = int(rng.integers(20, 300))
+        case = {
+            "n_rows": n_rows, "seed": int(rng.integers(1 << 31)), "out_of_order": bool(trial % 2),
+            "scope_type": "Rows" if trial % 4 >= 2 else "Days", "filter_future_data": bool(rng.integers(2)),
+        }
+        case["scope_value"] = int(rng.integers(1, n_rows + 5 if case["scope_type"] == "Rows" else n_rows // 24 + 3))
+        feed = make_synthetic_feed(n_rows, n_origins=int(rng.integers(1, 6)), seed=case["seed"])
+        if case["out_of_order"]:
+            swaps = rng.integers(0, n_rows, size=(int(rng.integers(1, 6)), 2))
+            order = np.arange(n_rows)
+            for a, b in swaps:
+                order[[a, b]] = order[[b, a]]
+            feed = feed.iloc[order].reset_index(drop=True)
+        measurements = make_synthetic_measurements(int(rng.integers(1, 10)), seed=case["seed"] + 1)
+        report_time = pd.Timestamp(feed["time"].iloc[int(rng.integers(n_rows))][:19])
+        args = (report_time, case["scope_type"], case["scope_value"], 18, measurements)
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            incremental = process_feed_incremental(feed.copy(), "Sm", *args, 4000.0, state_dir=state_dir)
+        expected = process_feed_report(feed.copy(), "Sm", *args, 4000.0)
+
+        df = feed.copy()
+        df.columns = df.columns.str.strip().str.lower()
+        normalize_feed_times(df)
+        view = df[df["time"] <= report_time] if case["filter_future_data"] else df
+        batch, _ = process_feeds_batch([(feed.copy(), "Sm")], [report_time], case["scope_type"], case["scope_value"],
+                                       18, measurements, filter_future_data=case["filter_future_data"])
+        batch_expected = process_feed_report(view.copy(), "Sm", *args, get_input_value(view, report_time))
+        try:
+            pd.testing.assert_frame_equal(_sorted_report(incremental), _sorted_report(expected), check_dtype=False)
+            pd.testing.assert_frame_equal(_sorted_report(batch[report_time]), _sorted_report(batch_expected),
+                                          check_dtype=False)
+        except AssertionError:
+            return dict(case, report_time=str(report_time))
+    return None
+
+def git_label():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "local"
+
+def save_results(results, label, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{label}_{dt.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as fh:
+        json.dump({"label": label, "python": sys.version.split()[0], "pandas": pd.__version__,
+                   "numpy": np.__version__, "cases": results}, fh, indent=2)
+    return path
+
+# ✅ Side-by-side stage timings against an earlier results file (ratio > 1 = slower now)
+def compare_results(current, baseline_path):
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    previous = {(c["rows"], c["origins"], c["measurements"]): c for c in baseline["cases"]}
+    lines = []
+    for case in current:
+        key = (case["rows"], case["origins"], case["measurements"])
+        if key not in previous:
+            continue
+        before = previous[key]
+        ratios = ", ".join(
+            f"{stage} ×{case['seconds'][stage] / before['seconds'][stage]:.2f}"
+            for stage in case["seconds"] if before["seconds"].get(stage)
+        )
+        lines.append(f"rows={key[0]:,} origins={key[1]} meas={key[2]}: {ratios}")
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark process_feed stages on synthetic feeds.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[5_000, 20_000, 80_000])
+    parser.add_argument("--origins", type=int, nargs="+", default=[20, 60])
+    parser.add_argument("--measurements", type=int, nargs="+", default=[80])
+    parser.add_argument("--change-prob", type=float, default=0.2)
+    parser.add_argument("--label", default=None, help="results label (default: git revision)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--check", type=int, default=None, metavar="TRIALS",
+                        help="only run the randomized parity checks")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        mismatch = check_process_feed(args.check)
+        if mismatch is not None:
+            print(f"❌ process_feed differs from the original loop for {mismatch}")
+            sys.exit(1)
+        print(f"✅ {args.check} random feeds match the original loop")
+        mismatch = check_event_reports(args.check)
+        if mismatch is not None:
+            print(f"❌ Incremental / batch report differs from process_feed_report for {mismatch}")
+            sys.exit(1)
+        print(f"✅ {args.check} random feeds give the same incremental and batch reports")
+        return
+
+    results = []
+    for n_rows in args.rows:
+        for n_origins in args.origins:
+            for n_meas in args.measurements:
+                case = run_case(n_rows, n_origins, n_meas, change_prob=args.change_prob)
+                results.append(case)
+                timings = "  ".join(f"{k} {v:.3f}s" for k, v in case["seconds"].items())
+                print(f"rows={n_rows:,} origins={n_origins} meas={n_meas} travelers={case['travelers']:,}  {timings}  "
+                      f"end-to-end {case['process_feed_report']['seconds']:.3f}s "
+                      f"peak {case['process_feed_report']['peak_mb']:.1f} MB")
+
+    path = save_results(results, args.label or git_label())
+    print(f"💾 Saved {path}")
+    if args.compare:
+        for line in compare_results(results, args.compare):
+            print(line)
+
+if __name__ == "__main__":
+    main()
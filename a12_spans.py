@@ -0,0 +1,133 @@
+import json
+import time
+import threading
+import tracemalloc
+
+# ⏱️ Pipeline instrumentation – spans around each stage (wall time, rows, peak memory)
+#
+#   enable_spans(track_memory=True)
+#   with span("process_feed Sm") as s:
+#       report = process_feed_report(...)
+#       s.rows = len(report)
+#
+# Disabled (the default), span() hands back one shared no-op object: no timing,
+# no allocation, no tracemalloc. Peak memory is only tracked with track_memory=True,
+# because tracemalloc slows every allocation while it runs.
+#
+# Streamlit runs each browser session's script in its own thread of one process, so the
+# switches and recorded spans are per thread: one session's reset_spans() or
+# enable_spans(False) never touches another's run. tracemalloc is process-wide; it stays
+# on while any live thread tracks memory (peaks then include overlapping sessions' work).
+
+_LOCAL = threading.local()
+_MEMORY_LOCK = threading.Lock()
+_MEMORY_THREADS = set()  # threads that enabled track_memory
+
+def _state():
+    if not hasattr(_LOCAL, "spans"):
+        _LOCAL.enabled = False
+        _LOCAL.track_memory = False
+        _LOCAL.spans = []
+        _LOCAL.stack = []
+    return _LOCAL
+
+class _NullSpan:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass  # s.rows = ... is a no-op while disabled
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+    def __enter__(self):
+        state = _state()
+        self.spans, self.stack, self.track_memory = state.spans, state.stack, state.track_memory
+        self.depth = len(self.stack)
+        self.slot = len(self.spans)
+        self.spans.append(None)  # reserve the slot so parents list before their children
+        self.stack.append(self)
+        if self.track_memory:
+            self.start_mem = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        self.stack.pop()
+        record = {"name": self.name, "depth": self.depth, "seconds": round(seconds, 6), "rows": self.rows}
+        if self.track_memory and tracemalloc.is_tracing():
+            # Children reset the tracemalloc peak, so fold their peaks back in
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            record["peak_mb"] = round(max(peak - self.start_mem, 0) / 2**20, 2)
+            if self.stack:
+                self.stack[-1].child_peak = max(self.stack[-1].child_peak, peak)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.spans[self.slot] = record
+        return False
+
+def span(name, rows=None):
+    if not _state().enabled:
+        return _NULL_SPAN
+    return _Span(name, rows)
+
+# ✅ Switches for the calling thread; tracemalloc stops once no live thread tracks memory
+def enable_spans(enabled=True, track_memory=False):
+    state = _state()
+    state.enabled = enabled
+    state.track_memory = enabled and track_memory
+    current = threading.current_thread()
+    with _MEMORY_LOCK:
+        if state.track_memory:
+            _MEMORY_THREADS.add(current)
+        else:
+            _MEMORY_THREADS.discard(current)
+        _MEMORY_THREADS.difference_update([t for t in _MEMORY_THREADS if not t.is_alive()])
+        if _MEMORY_THREADS and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _MEMORY_THREADS and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def reset_spans():
+    state = _state()
+    state.spans = []
+    state.stack = []
+
+def get_spans():
+    return [record for record in _state().spans if record is not None]
+
+def spans_json(meta=None):
+    return json.dumps({"meta": meta or {}, "spans": get_spans()}, indent=2, default=str)
+
+# ✅ Collapsible sidebar panel with the recorded spans + JSON download
+def render_span_panel(st, meta=None):
+    spans = get_spans()
+    if not spans:
+        return
+    with st.sidebar.expander("⏱️ Pipeline timings", expanded=False):
+        total = sum(s["seconds"] for s in spans if s["depth"] == 0)
+        st.markdown(f"**Total:** {total:.2f}s")
+        rows = []
+        for s in spans:
+            rows.append({
+                "Stage": "  " * s["depth"] + s["name"],
+                "Seconds": s["seconds"],
+                "Rows": s["rows"],
+                "Peak MB": s.get("peak_mb"),
+            })
+        st.dataframe(rows, hide_index=True)
+        st.download_button("📥 Export timings JSON", data=spans_json(meta).encode(),
+                           file_name="pipeline_timings.json", mime="application/json")
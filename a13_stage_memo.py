@@ -0,0 +1,66 @@
+import sys
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# 🧠 Stage memo – pipeline stage results kept in memory across Streamlit reruns
+#
+#   final = memoize_stage("report", (small_hash, big_hash, sheet, report_time, ...), build_report)
+#
+# Every widget interaction reruns the whole script. Each stage looks its result up by
+# (stage name, inputs) first, so toggling a detector only runs that detector. Like the
+# measurement store and the worker pool, the memo is module-level and survives reruns.
+# Entries are evicted least-recently-used first once their estimated size passes
+# MAX_STAGE_BYTES. Cached values are shared: callers must not modify them in place.
+
+MAX_STAGE_BYTES = 1024 * 1024 * 1024
+_MEMO = OrderedDict()  # (stage, *key) -> (value, nbytes)
+_MEMO_BYTES = 0
+_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+# ✅ Rough in-memory size of a stage result (frames, arrays and containers of them)
+def estimate_nbytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+def _evict(max_bytes):
+    global _MEMO_BYTES
+    while _MEMO_BYTES > max_bytes and _MEMO:
+        _, (_, nbytes) = _MEMO.popitem(last=False)
+        _MEMO_BYTES -= nbytes
+        _STATS["evictions"] += 1
+
+# ✅ Return the cached result for (stage, key), or compute + store it
+def memoize_stage(stage, key, compute, max_bytes=None):
+    global _MEMO_BYTES
+    max_bytes = MAX_STAGE_BYTES if max_bytes is None else max_bytes
+    full_key = (stage,) + tuple(key)
+    if full_key in _MEMO:
+        _MEMO.move_to_end(full_key)
+        _STATS["hits"] += 1
+        return _MEMO[full_key][0]
+
+    _STATS["misses"] += 1
+    value = compute()
+    nbytes = estimate_nbytes(value)
+    if nbytes <= max_bytes:  # a single result over budget is returned but not kept
+        _MEMO[full_key] = (value, nbytes)
+        _MEMO_BYTES += nbytes
+        _evict(max_bytes)
+    return value
+
+def clear_stage_memo(stage=None):
+    global _MEMO_BYTES
+    for full_key in [k for k in _MEMO if stage is None or k[0] == stage]:
+        _MEMO_BYTES -= _MEMO.pop(full_key)[1]
+
+def stage_memo_stats():
+    return {**_STATS, "entries": len(_MEMO), "mb": round(_MEMO_BYTES / 2**20, 1)}
@@ -0,0 +1,129 @@
+import io
+import numpy as np
+import pandas as pd
+from a02_utils import compile_origin_schema, parse_time_column, upload_bytes
+
+# 📜 Declared schemas – one per file kind, driving a single typed CSV parse
+#
+#   feed   = read_with_schema(upload, feed_schema, normalize_headers=True)
+#   report = read_with_schema(upload, PROX_TRAVELER_SCHEMA)
+#
+# A schema maps column → kind:
+#   "float64"   numeric, unparseable values → NaN
+#   "number"    numeric if every value parses, otherwise left as read (measurement m # / r #)
+#   "str"       text, missing values → ""
+#   "category"  categorical labels
+#   "datetime"  pd.to_datetime(errors="coerce")
+#   "feed_time" parse_time_column (tz suffixes, mixed formats)
+#   "raw"       read as the parser infers it, no conversion (columns only validation looks at)
+#
+# Only declared columns that exist in the header are read (include_columns), by the
+# multithreaded pyarrow CSV reader with explicit column types, so there is no to_numeric
+# pass afterwards. If pyarrow rejects a value, the file is re-read with the C engine and
+# just the float64 columns are coerced – the same result the old read_csv + to_numeric gave.
+
+# Every column validate_feed checks (a04 KEY_COLUMNS) is declared, so pruning never hides one
+FEED_SCHEMA = {
+    "time": "feed_time", "open": "float64", "output": "float64", "m #": "float64", "input": "float64",
+    "arrival": "raw",
+}
+
+# Our own exported traveler report (REPORT_COLUMNS)
+TRAVELER_SCHEMA = {
+    "Feed": "category", "Arrival": "datetime", "Origin": "category", "M Name": "str",
+    "M #": "float64", "R #": "float64", "Tag": "category", "Family": "category",
+    "Input": "float64", "Output": "float64", "Diff": "float64", "Day": "category",
+}
+
+# Traveler CSVs read by the proximity analyzers: numeric M Name / Origin codes, Departure
+PROX_TRAVELER_SCHEMA = {
+    "Feed": "str", "Arrival": "datetime", "Departure": "datetime", "Origin": "float64",
+    "M Name": "float64", "Input": "float64", "Output": "float64", "Day": "str",
+}
+
+MEASUREMENT_SCHEMA = {
+    "m value": "float64", "m #": "number", "r #": "number", "tag": "category", "family": "category",
+}
+
+# Time columns are read as text: pyarrow would convert tz-suffixed stamps to UTC, not wall time
+_ARROW_DTYPES = {"float64": "float64", "str": "string", "category": "category", "datetime": "string", "feed_time": "string"}
+
+def _arrow_type(dtype):
+    import pyarrow as pa
+    return {"float64": pa.float64(), "string": pa.string(), "category": pa.dictionary(pa.int32(), pa.string())}[dtype]
+
+def _read_arrow(data, usecols, dtypes):
+    from pyarrow import csv
+    options = csv.ConvertOptions(
+        column_types={col: _arrow_type(dtype) for col, dtype in dtypes.items()},
+        include_columns=usecols,
+        strings_can_be_null=True,  # blank text cells → missing, as read_csv gives
+    )
+    return csv.read_csv(io.BytesIO(data), convert_options=options).to_pandas()
+
+# ✅ Raw feed: fixed columns + every H/L/C column the origin schema knows about (valid or malformed)
+def feed_schema(columns):
+    schema = {col: kind for col, kind in FEED_SCHEMA.items() if col in columns}
+    origin_schema = compile_origin_schema(tuple(columns))
+    for spec in origin_schema.origins.values():
+        schema.update({col: "float64" for col in spec.cols})
+    for cols in origin_schema.malformed.values():
+        schema.update({col: "float64" for col in cols})
+    return schema
+
+def _header_key(col, normalize_headers):
+    return str(col).strip().lower() if normalize_headers else col
+
+# ✅ Apply the post-read kinds (and any kind the parser could not produce directly)
+def apply_schema(df, schema):
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if kind == "float64" and values.dtype != np.float64:
+            df[col] = pd.to_numeric(values, errors="coerce").astype(np.float64)
+        elif kind == "number" and not pd.api.types.is_numeric_dtype(values):
+            numeric = pd.to_numeric(values, errors="coerce")
+            if numeric.notna().sum() == values.notna().sum():
+                df[col] = numeric
+        elif kind == "category" and not isinstance(values.dtype, pd.CategoricalDtype):
+            df[col] = values.astype("category")
+        elif kind == "str":
+            if not pd.api.types.is_string_dtype(values):
+                values = values.astype("string")
+            df[col] = values.fillna("") if values.isna().any() else values
+        elif kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(values):
+            df[col] = pd.to_datetime(values, errors="coerce")
+        elif kind == "feed_time":
+            if not pd.api.types.is_datetime64_dtype(values):
+                df[col] = parse_time_column(values)
+            df.attrs["time_parsed"] = True
+    return df
+
+# ✅ One typed parse of a CSV; schema is a dict or a function of the (normalized) header
+def read_with_schema(source, schema, normalize_headers=False):
+    data = upload_bytes(source)
+    header = pd.read_csv(io.BytesIO(data), nrows=0).columns
+    keys = [_header_key(col, normalize_headers) for col in header]
+    if callable(schema):
+        schema = schema(keys)
+    raw_names = {key: raw for key, raw in zip(keys, header)}
+    usecols = [raw_names[key] for key in keys if key in schema]
+    dtypes = {raw_names[key]: _ARROW_DTYPES[kind] for key, kind in schema.items()
+              if key in raw_names and kind in _ARROW_DTYPES}
+
+    try:
+        df = _read_arrow(data, usecols, dtypes)
+    except Exception:  # a value the typed parse rejects (or no pyarrow): tolerant re-read
+        text_dtypes = {col: dtype for col, dtype in dtypes.items() if dtype != "float64"}
+        df = pd.read_csv(io.BytesIO(data), usecols=usecols, dtype=text_dtypes)
+
+    if normalize_headers:
+        df.columns = [_header_key(col, True) for col in df.columns]
+    return apply_schema(df, schema)
+
+def read_feed_csv(source):
+    return read_with_schema(source, feed_schema, normalize_headers=True)
+
+def read_traveler_csv(source):
+    return read_with_schema(source, TRAVELER_SCHEMA)
@@ -0,0 +1,200 @@
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+# 📉 Descent-to-zero search on M # arrays
+#
+#   paths = find_descent_paths(subset["M #"].to_numpy())   # index arrays into subset
+#
+# The greedy path from row i keeps every row whose |M #| is strictly below the last kept
+# one and stops at the first M # == 0. The row it keeps after j is therefore j's next
+# strictly smaller |M #| (a zero is smaller than anything), so every path is a walk along
+# one "next smaller" pointer array. One monotonic-stack pass builds the pointers; each
+# path then costs its own length instead of a rescan of the rest of the output.
+#
+#   python a15_sequences.py --trials 2000   # randomized checks against the original definitions
+
+# ✅ Reference: the original per-start greedy scan (also used for non-finite M #)
+def greedy_descent_paths(m):
+    paths = []
+    for i in range(len(m)):
+        path = []
+        seen = set()
+        last_abs = float("inf")
+        for j in range(i, len(m)):
+            abs_m = abs(m[j])
+            if m[j] == 0:
+                if len(path) >= 2:
+                    path.append(j)
+                    paths.append(np.array(path, dtype=np.intp))
+                break
+            if abs_m in seen or abs_m >= last_abs:
+                continue
+            path.append(j)
+            seen.add(abs_m)
+            last_abs = abs_m
+    return paths
+
+# ✅ next_smaller[j] = first k > j with |m[k]| < |m[j]|, or -1
+def next_smaller(abs_m):
+    result = np.full(len(abs_m), -1, dtype=np.intp)
+    stack = []
+    for k, value in enumerate(abs_m.tolist()):
+        while stack and abs_m[stack[-1]] > value:
+            result[stack.pop()] = k
+        stack.append(k)
+    return result
+
+# ✅ Every greedy descent path (≥ 2 non-zero rows, then the zero), in start-row order
+def find_descent_paths(m):
+    m = np.asarray(m, dtype=np.float64)
+    if not np.isfinite(m).all():
+        return greedy_descent_paths(m)  # NaN / inf break the strict-ordering shortcut
+    abs_m = np.abs(m)
+    nxt = next_smaller(abs_m)
+
+    # Non-zero rows before the terminating zero, filled right to left (-1 = no zero ahead)
+    steps = np.zeros(len(m), dtype=np.intp)
+    for j in range(len(m) - 1, -1, -1):
+        if abs_m[j] == 0:
+            continue
+        k = nxt[j]
+        if k < 0 or steps[k] < 0:
+            steps[j] = -1
+        else:
+            steps[j] = 1 + (steps[k] if abs_m[k] else 0)
+
+    paths = []
+    for i in np.flatnonzero(steps >= 2):
+        path = np.empty(steps[i] + 1, dtype=np.intp)
+        j = i
+        for pos in range(len(path)):
+            path[pos] = j
+            j = nxt[j]
+        paths.append(path)
+    return paths
+
+# 🧩 Maximal-sequence filter
+#
+# A signature (tuple of M #) is dropped when another, strictly longer signature contains
+# all of its values. Each value keeps a bitset (Python int) of the signatures holding it,
+# and each length a bitset of the signatures longer than it; ANDing those answers "is
+# there a longer superset?" for one signature in |sig| word-parallel operations, instead
+# of building two sets for every pair. Identical signatures share one answer.
+
+# ✅ Reference: the original pairwise subset check
+def maximal_sequences_pairwise(signatures):
+    return [i for i, sig in enumerate(signatures)
+            if not any(set(sig).issubset(set(other)) and len(sig) < len(other)
+                       for j, other in enumerate(signatures) if i != j)]
+
+# ✅ Positions of the signatures not embedded in a longer one, in input order
+def maximal_sequences(signatures):
+    holders = {}
+    by_length = {}
+    for k, sig in enumerate(signatures):
+        for value in set(sig):
+            holders.setdefault(value, []).append(k)
+        by_length.setdefault(len(sig), []).append(k)
+    holders = {value: sum(1 << k for k in ids) for value, ids in holders.items()}
+
+    longer, running = {}, 0
+    for length in sorted(by_length, reverse=True):
+        longer[length] = running
+        running |= sum(1 << k for k in by_length[length])
+
+    keep, verdicts = [], {}
+    for k, sig in enumerate(signatures):
+        if sig not in verdicts:
+            cover = longer[len(sig)]
+            for value in set(sig):
+                if not cover:
+                    break
+                cover &= holders[value]
+            verdicts[sig] = not cover
+        if verdicts[sig]:
+            keep.append(k)
+    return keep
+
+# 🗂️ Output groups and detection records (shared by the a003 detectors)
+#
+# Detectors walk the report one output at a time and store each hit as the report
+# positions of its rows; the rows are only materialized when a hit is displayed.
+
+# ✅ Detection hit as a compact record: df positions of the sequence rows, no DataFrame kept
+# seq is a slice of a reset-index output group, so its labels are positions in that group.
+def make_record(model, label, output, seq, positions):
+    return {
+        "model": model,
+        "label": label,
+        "output": output,
+        "rows": positions[seq.index.to_numpy()],
+        "timestamp": seq.iloc[-1]["Arrival"],
+        "feeds": seq["Feed"].nunique()
+    }
+
+# ✅ Materialize a record's rows from the report it was detected on
+def sequence_rows(df, record):
+    return df.iloc[record["rows"]]
+
+# ✅ Traveler report sorted once by (Output, Arrival), cut into one contiguous slice per output
+# Outputs come in first-appearance order (same as df["Output"].unique()), so signature
+# de-duplication across outputs sees the same order as the old per-output filtering.
+# Each slice comes with the df positions of its rows, so hits can be stored as positions.
+def iter_output_groups(df):
+    codes, outputs = pd.factorize(df["Output"])
+    arrival = pd.to_datetime(df["Arrival"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    arrival = np.where(arrival == np.iinfo(np.int64).min, np.iinfo(np.int64).max, arrival)  # NaT last
+    order = np.lexsort((arrival, codes))
+    order = order[codes[order] >= 0]  # NaN outputs never matched df["Output"] == output
+    ordered = df.iloc[order].reset_index(drop=True)
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(order)]])
+    for start, stop in zip(starts, stops):
+        if stop > start:
+            yield outputs[codes[order[start]]], ordered.iloc[start:stop].reset_index(drop=True), order[start:stop]
+
+# ✅ Randomized equivalence check of find_descent_paths against greedy_descent_paths
+def check_descent_paths(trials=1000, max_len=60, seed=0):
+    rng = np.random.default_rng(seed)
+    for trial in range(trials):
+        n = int(rng.integers(0, max_len + 1))
+        span = int(rng.integers(1, 8))
+        m = rng.integers(-span, span + 1, size=n).astype(np.float64)
+        if trial % 10 == 0 and n:
+            m[rng.integers(0, n)] = np.nan
+        expected = greedy_descent_paths(m)
+        actual = find_descent_paths(m)
+        if len(expected) != len(actual) or any(not np.array_equal(a, b) for a, b in zip(expected, actual)):
+            return m
+    return None
+
+# ✅ Randomized equivalence check of maximal_sequences against the pairwise filter
+def check_maximal_sequences(trials=1000, max_len=60, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(trials):
+        m = rng.integers(-4, 5, size=int(rng.integers(0, max_len + 1))).astype(np.float64)
+        signatures = [tuple(m[path].tolist()) for path in find_descent_paths(m)]
+        signatures += [tuple(rng.integers(-3, 4, size=int(rng.integers(0, 4))).tolist()) for _ in range(3)]
+        if maximal_sequences(signatures) != maximal_sequences_pairwise(signatures):
+            return signatures
+    return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the descent search and maximal filter against the originals.")
+    parser.add_argument("--trials", type=int, default=1000)
+    parser.add_argument("--max-len", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    mismatch = check_descent_paths(args.trials, args.max_len, args.seed)
+    if mismatch is not None:
+        print(f"❌ Paths differ for M # = {mismatch.tolist()}")
+        sys.exit(1)
+    print(f"✅ {args.trials} random outputs match the greedy definition")
+    mismatch = check_maximal_sequences(args.trials, args.max_len, args.seed)
+    if mismatch is not None:
+        print(f"❌ Maximal filter differs for signatures {mismatch}")
+        sys.exit(1)
+    print(f"✅ {args.trials} random signature sets match the pairwise filter")
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# 🏷️ Per-row A-model classification codes – computed once per traveler report
+#
+#   codes = classification_codes(report)               # {"Time Bucket": int8[], "Origin Class": int8[]}
+#   model, label = classify_A_sequence(codes["Time Bucket"][rows], codes["Origin Class"][rows])
+#
+# Time Bucket is the open / early / late bucket of Arrival. Origin Class is a bitmask of
+# the origin's classes (EPIC | ANCHOR), matched case-insensitively. A sequence is
+# "strong" when any prior row has a class bit set, so classification is a bitwise OR over
+# the prior rows plus one lookup in A_MODEL_TABLE[time bucket, origin class, strong].
+#
+# One origin set for the detectors the app and CLI run (a003_models_01cp A and B models,
+# a003_models_06cg) and abcd_cP_07c. Origins are named Kepler-62f / Kepler-442b; the truncated
+# "kepler-62" / "kepler-44" still in the older a003 scripts (earlier a01_main versions) never matched one.
+
+EPIC_ORIGINS = frozenset({"trinidad", "tobago", "wasp-12b", "macedonia"})
+ANCHOR_ORIGINS = frozenset({"spain", "saturn", "jupiter", "kepler-62f", "kepler-442b"})
+
+EPIC, ANCHOR = 1, 2
+TIME_OPEN, TIME_EARLY, TIME_LATE = 0, 1, 2
+
+A_MODEL_LABELS = {
+    "A01": "Open Epic 0", "A02": "Open Anchor 0", "A03": "Open non-Anchor 0",
+    "A04": "Early non-Anchor 0", "A05": "Late Anchor 0", "A06": "Late non-Anchor 0",
+    "A07": "Open general 0", "A08": "Early general 0", "A09": "Late general 0",
+}
+
+# ✅ Open = 18:00 sharp; early = 01:00–01:58 (the old "18 < hour < 2" half never matched); else late
+def time_buckets(arrival):
+    arrival = pd.to_datetime(pd.Series(arrival), errors="coerce")
+    hour, minute = arrival.dt.hour.to_numpy(), arrival.dt.minute.to_numpy()
+    buckets = np.full(len(arrival), TIME_LATE, dtype=np.int8)
+    buckets[(hour == 1) & (minute < 59)] = TIME_EARLY
+    buckets[(hour == 18) & (minute == 0)] = TIME_OPEN
+    return buckets
+
+def origin_class(name):
+    name = str(name).strip().lower()
+    return (EPIC if name in EPIC_ORIGINS else 0) | (ANCHOR if name in ANCHOR_ORIGINS else 0)
+
+# ✅ Class bitmask per row, computed once per distinct origin
+def origin_classes(origins):
+    codes, uniques = pd.factorize(pd.Series(origins))
+    table = np.array([origin_class(name) for name in uniques] + [0], dtype=np.int8)
+    return table[codes]  # code -1 (missing origin) → last entry, no class
+
+def classification_codes(df):
+    return {"Time Bucket": time_buckets(df["Arrival"]), "Origin Class": origin_classes(df["Origin"])}
+
+# ✅ Report copy with the code columns (cached reports are shared, so never in place)
+def add_classification_columns(df):
+    return df.assign(**classification_codes(df))
+
+def _rule(time_bucket, origin_class, strong):
+    is_epic, is_anchor = bool(origin_class & EPIC), bool(origin_class & ANCHOR)
+    open_, early, late = time_bucket == TIME_OPEN, time_bucket == TIME_EARLY, time_bucket == TIME_LATE
+    if is_epic and open_: return "A01"
+    if is_anchor and open_: return "A02"
+    if not is_anchor and open_ and strong: return "A03"
+    if not is_anchor and early and strong: return "A04"
+    if is_anchor and late: return "A05"
+    if not is_anchor and late and strong: return "A06"
+    if not is_anchor and open_ and not strong: return "A07"
+    if not is_anchor and early and not strong: return "A08"
+    if not is_anchor and late and not strong: return "A09"
+    return None
+
+# [time bucket, origin class, strong] → model code (None: no A model)
+A_MODEL_TABLE = np.array([[[_rule(t, c, s) for s in (False, True)] for c in range(4)] for t in range(3)], dtype=object)
+
+# ✅ A model of a sequence from its rows' codes; the last row is the zero
+def classify_A_sequence(time_buckets, origin_classes):
+    prior = np.bitwise_or.reduce(origin_classes[:-1]) if len(origin_classes) > 1 else 0
+    model = A_MODEL_TABLE[time_buckets[-1], origin_classes[-1], int(prior != 0)]
+    return (model, A_MODEL_LABELS[model]) if model else (None, None)
@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from collections import defaultdict
+from a15_sequences import maximal_sequences
+from a16_origin_classes import add_classification_columns, classify_A_sequence
+from a14_schemas import read_traveler_csv
 
 st.set_page_config(layout="wide")
 st.title("🅰️ Position A Models – Output-Centric Scanner v07c")
@@ -37,40 +39,15 @@ def find_flexible_descents(df_subset):
             last_abs = abs_m
 
     # 🧠 Filter embedded shorter sequences
-    filtered = []
     all_signatures = [tuple(seq["M #"].tolist()) for seq in raw_sequences]
-
-    for i, sig in enumerate(all_signatures):
-        longer = any(set(sig).issubset(set(other)) and len(sig) < len(other) for j, other in enumerate(all_signatures) if i != j)
-        if not longer:
-            filtered.append(raw_sequences[i])
+    filtered = [raw_sequences[i] for i in maximal_sequences(all_signatures)]
 
     return filtered
 
 def sequence_signature(seq): return tuple(seq["M #"].tolist())
 
-def classify_A_model(row_0, prior_rows):
-    epic = {"Trinidad", "Tobago", "WASP-12b", "Macedonia"}
-    anchor = {"Saturn", "Jupiter", "Kepler-62f", "Kepler-442b"}
-    t0 = row_0["Arrival"]
-    o0 = row_0["Origin"]
-    time = "open" if t0.hour == 18 and t0.minute == 0 else \
-           "early" if (18 < t0.hour < 2 or (t0.hour == 1 and t0.minute < 59)) else "late"
-    is_epic = o0 in epic
-    is_anchor = o0 in anchor
-    prior = set(prior_rows["Origin"])
-    strong = bool(prior & epic) or bool(prior & anchor)
-
-    if is_epic and time == "open": return "A01", "Open Epic 0"
-    if is_anchor and time == "open": return "A02", "Open Anchor 0"
-    if not is_anchor and time == "open" and strong: return "A03", "Open non-Anchor 0"
-    if not is_anchor and time == "early" and strong: return "A04", "Early non-Anchor 0"
-    if is_anchor and time == "late": return "A05", "Late Anchor 0"
-    if not is_anchor and time == "late" and strong: return "A06", "Late non-Anchor 0"
-    if not is_anchor and time == "open" and not strong: return "A07", "Open general 0"
-    if not is_anchor and time == "early" and not strong: return "A08", "Early general 0"
-    if not is_anchor and time == "late" and not strong: return "A09", "Late general 0"
-    return None, None
+def classify_A_model(seq):
+    return classify_A_sequence(seq["Time Bucket"].to_numpy(), seq["Origin Class"].to_numpy())
 
 def detect_A_models(df):
     report_time = df["Arrival"].max()
@@ -88,9 +65,8 @@ def detect_A_models(df):
             if sig in seen_signatures: continue
             seen_signatures.add(sig)
 
-            prior = seq.iloc[:-1]
             last = seq.iloc[-1]
-            model, label = classify_A_model(last, prior)
+            model, label = classify_A_model(seq)
 
             if model:
                 model_outputs[model].append({
@@ -138,7 +114,7 @@ def show_a_model_results(model_outputs, report_time):
                         icons = "".join([feed_icon(row["Feed"]) for _, row in seq.iterrows()])
                         summary = f"{m_path} Cross [{icons}]"
                         st.markdown(summary)
-                        st.table(seq.reset_index(drop=True))
+                        st.table(seq.drop(columns=["Time Bucket", "Origin Class"]).reset_index(drop=True))
 
         output_count = len(set(r["output"] for r in results))
         header = f"{code}. 2+ to {label} – {output_count} output{'s' if output_count != 1 else ''}"
@@ -151,14 +127,13 @@ def show_a_model_results(model_outputs, report_time):
 
 # 🚀 Streamlit Main Execution
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
-    df["Arrival"] = pd.to_datetime(df["Arrival"], errors="coerce")
+    df = read_traveler_csv(uploaded_file)  # our exported report: typed parse, Arrival already datetime
     required = {"Arrival", "Day", "Origin", "M #", "Feed", "Output"}
     if not required.issubset(df.columns):
         st.error("Missing columns: " + ", ".join(required - set(df.columns)))
         st.stop()
 
-    df = df[df["Output"] > 0].copy()
+    df = add_classification_columns(df[df["Output"] > 0])
     model_outputs, report_time = detect_A_models(df)
     show_a_model_results(model_outputs, report_time)
 else: